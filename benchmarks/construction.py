@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+compares the cost of building parsed models with and without the validation of pydantic.
+
+usage: python -m benchmarks.construction [--number 10000]
+"""
+
+from argparse import ArgumentParser
+from json import dumps
+from timeit import repeat
+from typing import Any, Callable, Dict, List, Type
+
+from requests import Response
+
+from crawlers import Crawler
+from crawlers import CHDBits, MTeam, FSM, TTG, PTerClub, RedLeaves, OpenCD, OurBits, U2, UBits, LemonHD
+from crawlers.base import Flow, Promotion, Torrent
+
+CRAWLERS: List[Type[Crawler]] = [CHDBits, MTeam, FSM, TTG, PTerClub, RedLeaves, OpenCD, OurBits, U2, UBits, LemonHD]
+
+def build_response(payload: Dict[str, Any]) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = dumps(payload).encode('utf8') # pylint: disable=protected-access
+    return response
+
+def drive(flow: Flow[Any], response: Response) -> Any:
+    next(flow)
+    try:
+        flow.send(response)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError('the flow sent more than one request')
+
+def mteam_page(rows: int) -> Dict[str, Any]:
+    items = [
+        {'id': str(index), 'name': f'torrent {index}', 'size': 1024 ** 3, 'status': {'seeders': 10, 'leechers': 1, 'discount': 'FREE'}}
+        for index in range(rows)
+    ]
+    return {'code': '0', 'message': 'SUCCESS', 'data': {'data': items}}
+
+def fsm_page(rows: int) -> Dict[str, Any]:
+    items = [
+        {
+            'tid': str(index),
+            'title': f'torrent {index}',
+            'fileSize': '1.50 GB',
+            'peers': {'upload': 10, 'download': 1},
+            'status': {'downCoefficient': 0, 'upCoefficient': 1}
+        }
+        for index in range(rows)
+    ]
+    return {'data': {'list': items}}
+
+PAGES: Dict[Type[Crawler], Callable[[int], Dict[str, Any]]] = {MTeam: mteam_page, FSM: fsm_page}
+
+def build_torrents(crawler: Crawler, number: int) -> None:
+    promotion = Promotion.intern(upload_ratio=1, download_ratio=0)
+    for index in range(number):
+        crawler.build(
+            Torrent,
+            torrent_id=str(index),
+            torrent_name='torrent',
+            size=1024 ** 3,
+            seeders=10,
+            leechers=1,
+            hit_and_run=0,
+            promotion=promotion,
+            crawler=crawler
+        )
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=10000, help='the number of torrents built per crawler')
+    parser.add_argument('--repeat', type=int, default=5, help='the best of how many runs is reported')
+    parser.add_argument('--rows', type=int, default=100, help='the number of rows of a synthetic json page')
+    arguments = parser.parse_args()
+
+    print(f'{"crawler":<12}{"stage":<10}{"validated":>12}{"trusted":>12}{"speedup":>10}')
+    for crawler_class in CRAWLERS:
+        validated, trusted = crawler_class(headers={}), crawler_class(headers={}, trusted=True)
+
+        stages = {'build': lambda crawler: build_torrents(crawler, arguments.number)}
+        if crawler_class in PAGES:
+            page = PAGES[crawler_class](arguments.rows)
+            copies = max(arguments.number // arguments.rows, 1)
+            stages['page'] = lambda crawler: [
+                drive(crawler.torrents_page_flow(0), build_response(page)) for _ in range(copies) # pylint: disable=cell-var-from-loop
+            ]
+
+        for stage, function in stages.items():
+            validated_seconds = min(repeat(lambda: function(validated), number=1, repeat=arguments.repeat)) # pylint: disable=cell-var-from-loop
+            trusted_seconds = min(repeat(lambda: function(trusted), number=1, repeat=arguments.repeat)) # pylint: disable=cell-var-from-loop
+            print(
+                f'{crawler_class.__name__:<12}{stage:<10}'
+                f'{validated_seconds * 1000:>10.1f}ms{trusted_seconds * 1000:>10.1f}ms{validated_seconds / trusted_seconds:>9.1f}x'
+            )
+
+if __name__ == '__main__':
+    main()
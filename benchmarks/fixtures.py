@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+synthetic pages of every crawler, shaped like the pages of the real sites, for the benchmarks and the mock tracker.
+
+the pages of a site are built from a list of `SyntheticTorrent`. recorded pages in `benchmarks/fixtures/<Crawler>/`
+take precedence over the synthetic ones, see `python -m benchmarks.parsers record --help`.
+"""
+
+from json import dumps
+from os.path import join
+from os.path import exists
+from os.path import dirname
+from typing import Dict
+from typing import Callable
+from typing import List
+from typing import Type
+from typing import Tuple
+from typing import Optional
+from typing import NamedTuple
+
+from crawlers import NexusPHP, TTG, MTeam, FSM
+from crawlers.base import Crawler
+
+FIXTURES_DIRECTORY = join(dirname(__file__), 'fixtures')
+KINDS = ['user', 'torrents', 'detail', 'tasks']
+
+USER_ID = '1'
+USER_NAME = 'anonymous'
+EMAIL = 'anonymous@example.com'
+PASSKEY = '0123456789abcdef0123456789abcdef'
+
+class SyntheticTorrent(NamedTuple):
+    torrent_id: str
+    name: str
+    size_number: str
+    size_unit: str
+    seeders: int
+    leechers: int
+    upload_ratio: float
+    download_ratio: float
+    hit_and_run: str
+
+PROMOTIONS: List[Tuple[float, float]] = [(1, 0), (2, 1), (1, 0.5), (1, 1), (2, 0), (1, 0.3)]
+
+def synthetic_torrents(count: int, start: int = 0) -> List[SyntheticTorrent]:
+    torrents = []
+    for index in range(start, start + count):
+        upload_ratio, download_ratio = PROMOTIONS[index % len(PROMOTIONS)]
+        torrents.append(
+            SyntheticTorrent(
+                torrent_id=str(100000 + index),
+                name=f'Synthetic.Release.{index}.2024.1080p.BluRay.x264-GROUP',
+                size_number=f'{index % 90 + 1}.{index % 100:02d}',
+                size_unit='GB' if index % 4 else 'MB',
+                seeders=index * 37 % 2000,
+                leechers=index % 60,
+                upload_ratio=upload_ratio,
+                download_ratio=download_ratio,
+                hit_and_run=['', 'h3', 'h5'][index % 3]
+            )
+        )
+    return torrents
+
+# nexusphp
+
+NEXUSPHP_CLASSES: Dict[Tuple[float, float], str] = {(1, 0): 'pro_free', (2, 1): 'pro_2up', (1, 0.5): 'pro_50pctdown', (2, 0): 'pro_free2up', (1, 0.3): 'pro_30pctdown'}
+NEXUSPHP_FONTS: Dict[Tuple[float, float], str] = {(1, 0): 'free', (2, 1): 'twoup', (1, 0.5): 'halfdown', (2, 0): 'twoupfree', (1, 0.3): 'thirtypercent'}
+
+USER_LINK = f'<span><a href="userdetails.php?id={USER_ID}">{USER_NAME}</a></span>'
+USER_TITLES = {
+    'CHDBits': f'欢迎回来, {USER_LINK} [退出] [控制面板] 魔力值 [使用]: 1,234.5 邀请 [发送]: 0 上传量： 1.50 TB 下载量： 512.00 GB 当前活动： 3',
+    'PTerClub': f'欢迎回来, {USER_LINK} [退出] 猫粮 [使用 | 站免池]: 1,234.5 签到得猫粮 上传量： 1.50 TB 下载量： 512.00 GB 做种积分: 10.0',
+    'OpenCD': f'{USER_LINK} , 歡迎回來 魔力值 : 1,234.5 使用 上傳量：1.50 TB 下載量：512.00 GB 分享率',
+    'OurBits': f'欢迎回来, {USER_LINK} [退出] 魔力值 [使用]: 1,234.5 上传量： 1.50 TB 下载量： 512.00 GB 当前活动',
+    'UBits': f'欢迎回来, {USER_LINK} [退出] 魔力值 [使用]: 1,234.5 上传量: 1.50 TB 下载量: 512.00 GB 当前活动',
+    'RedLeaves': f'欢迎回来, {USER_LINK} 退出 上传量: 1.50 TB 下载量: 512.00 GB 魔力值 : 1,234.5',
+    'LemonHD': f'欢迎回来, {USER_LINK} [退出] 魔力值 [使用]: 1,234.5 [签到得魔力] 上传量： 1.50 TB 下载量： 512.00 GB',
+    'U2': f'欢迎回来, {USER_LINK} [退出] 上传量: 1.50 TB 下载量: 512.00 GB UCoin: 1234 (a)',
+}
+
+def nexusphp_user(crawler_class: Type[Crawler]) -> str:
+    title = USER_TITLES.get(crawler_class.__name__, USER_TITLES['OurBits'])
+    if crawler_class.__name__ == 'OpenCD':
+        info = f'<td>logo</td><td><div>{title}</div></td>'
+        email_label, passkey_label = '郵箱地址', '密匙'
+    else:
+        info = f'<td><span class="medium">{title}</span></td>'
+        email_label, passkey_label = '邮箱地址', '密钥'
+
+    return f'''<html><head><title>控制面板</title></head><body>
+<table id="info_block"><tr><td><table><tr>{info}</tr></table></td></tr></table>
+<table class="mainouter"><tr><td id="outer">
+<table><tr><td>控制面板</td></tr></table>
+<table>
+<tr><td>用户名</td><td>{USER_NAME}</td></tr>
+<tr><td>{email_label}</td><td>{EMAIL}</td></tr>
+<tr><td>分享率</td><td>2.930</td></tr>
+<tr><td>{passkey_label}</td><td><span data-content="{PASSKEY}">{PASSKEY}</span></td></tr>
+</table>
+</td></tr></table>
+</body></html>'''
+
+def nexusphp_row(crawler_class: Type[Crawler], torrent: SyntheticTorrent) -> str:
+    promotion = NEXUSPHP_CLASSES.get((torrent.upload_ratio, torrent.download_ratio))
+    promotion_image = f'<img class="{promotion}" src="pic/trans.gif" alt="promotion"/>' if promotion else ''
+    hit_and_run = ''
+    if torrent.hit_and_run and crawler_class.__name__ == 'CHDBits':
+        hit_and_run = f'<div class="circle"><div class="circle-text">{torrent.hit_and_run}</div></div>'
+    if torrent.hit_and_run and crawler_class.__name__ == 'UBits':
+        hit_and_run = '<img class="hitandrun" src="pic/trans.gif" alt="H&amp;R"/>'
+
+    title = f'''<td class="rowfollow"><table class="torrentname"><tr><td class="embedded">
+<a title="{torrent.name}" href="details.php?id={torrent.torrent_id}&amp;hit=1"><b>{torrent.name}</b></a>
+{promotion_image}{hit_and_run}<br/>synthetic subtitle</td></tr></table></td>'''
+    category = '<td class="rowfollow"><a href="?cat=401"><img class="c_movie" alt="Movies"/></a></td>'
+    comments = '<td class="rowfollow"><a href="comment.php">0</a></td>'
+    added = '<td class="rowfollow"><span title="2024-01-01 00:00:00">1天</span></td>'
+    size = f'<td class="rowfollow">{torrent.size_number}<br/>{torrent.size_unit}</td>'
+    peers = f'<td class="rowfollow"><b><a href="#seeders">{torrent.seeders:,}</a></b></td><td class="rowfollow">{torrent.leechers}</td>'
+    rest = '<td class="rowfollow">12</td><td class="rowfollow"><i>匿名</i></td>'
+
+    if crawler_class.__name__ == 'OpenCD':
+        cells = [category, '<td class="rowfollow"></td>', title, comments, added, '<td class="rowfollow"></td>', size, peers, rest]
+    else:
+        cells = [category, title, comments, added, size, peers, rest]
+    return '<tr>' + ''.join(cells) + '</tr>'
+
+def nexusphp_torrents(crawler_class: Type[Crawler], torrents: List[SyntheticTorrent]) -> str:
+    header = '<tr><td class="colhead">类型</td><td class="colhead">标题</td><td class="colhead">大小</td></tr>'
+    headers = header * getattr(crawler_class, 'list_header_rows', 1)
+    rows = '\n'.join(nexusphp_row(crawler_class, torrent) for torrent in torrents)
+    table = f'<table class="torrents" id="torrenttable">{headers}\n{rows}</table>'
+    if crawler_class.__name__ == 'OpenCD':
+        table = f'<form id="form_torrent">{table}</form>'
+    else:
+        table = f'<table><tr><td>{table}</td></tr></table>'
+
+    return f'''<html><head><title>种子</title></head><body>
+<table id="info_block"><tr><td><table><tr><td>{USER_TITLES['OurBits']}</td></tr></table></td></tr></table>
+<table class="mainouter"><tr><td>导航</td></tr><tr><td id="outer">{table}</td></tr></table>
+<table class="bottom"><tr><td>footer</td></tr></table>
+</body></html>'''
+
+def nexusphp_detail(crawler_class: Type[Crawler], torrent: SyntheticTorrent) -> str:
+    ratios = (torrent.upload_ratio, torrent.download_ratio)
+    font = f'<font class="{NEXUSPHP_FONTS[ratios]}"></font>' if ratios in NEXUSPHP_FONTS else ''
+    image = f'<img class="{NEXUSPHP_CLASSES[ratios]}" src="pic/trans.gif" alt="promotion"/>' if ratios in NEXUSPHP_CLASSES else ''
+    hit_and_run = '<img class="hitandrun" src="pic/trans.gif" alt="H&amp;R"/>' if torrent.hit_and_run else ''
+    size = f'{torrent.size_number} {torrent.size_unit}'
+    name = crawler_class.__name__
+
+    if name == 'OpenCD':
+        heading = f'<center><div>{torrent.name}</div><div>{image}</div></center><h1 id="top">{torrent.name}</h1>'
+        size_row = f'<tr><td>大小：</td><td>{size}</td></tr>'
+        peers = f'{torrent.seeders:,} 個做種者 | {torrent.leechers} 個下載者'
+    else:
+        heading = f'<h1 id="top">{torrent.name} {font} {image}</h1>'
+        separator = ': ' if name == 'U2' else '：'
+        size_text = f'大小{separator}{size}&#160;&#160;类型: 电影'
+        if name == 'CHDBits' and torrent.hit_and_run:
+            size_text += f' H&amp;R: {torrent.hit_and_run}'
+        size_row = f'<tr><td>基本信息</td><td>{size_text}</td></tr>'
+        peers = f'{torrent.seeders:,} 个做种者 | {torrent.leechers} 个下载者'
+
+    return f'''<html><head><title>种子详情</title></head><body>
+<table class="mainouter"><tr><td id="outer">
+{heading}
+<table>
+<tr><td>下载</td><td><a href="download.php?id={torrent.torrent_id}">{torrent.name}.torrent</a>{hit_and_run}</td></tr>
+<tr><td>副标题</td><td>synthetic subtitle</td></tr>
+{size_row}
+<tr><td>同伴</td><td id="peercount">{peers}</td></tr>
+</table>
+</td></tr></table>
+</body></html>'''
+
+def nexusphp_tasks(torrents: List[SyntheticTorrent]) -> str:
+    rows = '\n'.join(
+        f'<tr><td><img class="c_movie" alt="Movies"/></td><td><a href="details.php?id={torrent.torrent_id}&amp;hit=1" '
+        f'title="{torrent.name}"><b>{torrent.name}</b></a></td><td>{torrent.size_number}<br/>{torrent.size_unit}</td></tr>'
+        for torrent in torrents
+    )
+    return f'<table><tr><td>类型</td><td>标题</td><td>大小</td></tr>\n{rows}</table>'
+
+# ttg
+
+TTG_IMAGES: Dict[Tuple[float, float], str] = {(1, 0): '/pic/ico_free.gif', (1, 0.3): '/pic/ico_30.gif', (1, 0.5): '/pic/ico_half.gif'}
+
+def ttg_user() -> str:
+    rows = ''.join(f'<tr><td>{label}</td><td>-</td></tr>' for label in ['用户名', '头像', '签名', '时区'])
+    return f'''<html><head><title>控制面板</title></head><body>
+<table><tr><td>logo</td></tr></table>
+<table><tr><td><table><tr><td>欢迎, {USER_NAME} 上传量 :  1.50 TB&#160;&#160;下载量 : 512.00 GB&#160;&#160;积分 : 1234.5&#160;&#160;</td></tr></table></td></tr></table>
+<table id="main_table"><tr><td>
+<h1><a href="userdetails.php?id={USER_ID}">{USER_NAME}</a></h1>
+<table><tr><td>tabs</td></tr><tr><td><form><table>
+{rows}
+<tr><td>邮箱</td><td>{EMAIL}</td></tr>
+<tr><td>Passkey</td><td>{PASSKEY}</td></tr>
+</table></form></td></tr></table>
+</td></tr></table>
+</body></html>'''
+
+def ttg_row(torrent: SyntheticTorrent) -> str:
+    source = TTG_IMAGES.get((torrent.upload_ratio, torrent.download_ratio))
+    promotion = f'<img src="{source}" alt="promotion"/>' if source else ''
+    hit_and_run = '<img src="/pic/hit_run.gif" title="Hit and Run"/>' if torrent.hit_and_run else ''
+    return f'''<tr>
+<td><img src="/pic/cat_movie.gif" alt="Movie"/></td>
+<td><div class="name_left"><a href="/t/{torrent.torrent_id}/"><b>{torrent.name}</b></a>{promotion}{hit_and_run}</div></td>
+<td>3</td><td>0</td><td>2024-01-01</td><td>1天</td>
+<td>{torrent.size_number}<br/>{torrent.size_unit}</td>
+<td>12</td>
+<td><b><a href="#seeders">{torrent.seeders}</a></b>/
+<b><a href="#leechers">{torrent.leechers}</a></b></td>
+<td>匿名</td>
+</tr>'''
+
+def ttg_torrents(torrents: List[SyntheticTorrent]) -> str:
+    rows = '\n'.join(ttg_row(torrent) for torrent in torrents)
+    return f'''<html><head><title>种子</title></head><body>
+<table><tr><td>logo</td></tr></table>
+<table><tr><td>导航</td></tr></table>
+<table><tr><td><form><table>
+<tr><td>类型</td><td>名称</td></tr>
+{rows}
+</table></form></td></tr></table>
+</body></html>'''
+
+def ttg_detail(torrent: SyntheticTorrent) -> str:
+    source = TTG_IMAGES.get((torrent.upload_ratio, torrent.download_ratio))
+    promotion = f'<img src="{source}" alt="promotion"/>' if source else ''
+    hit_and_run = '<img src="/pic/hit_run.gif" alt="Hit &amp; Run"/>' if torrent.hit_and_run else ''
+    return f'''<html><head><title>种子详情</title></head><body>
+<table id="main_table"><tr><td>
+<h1>{torrent.name}</h1>
+<table><tr><td>下载</td><td><a href="/dl/{torrent.torrent_id}/synthetic">{torrent.name}.torrent</a></td></tr></table>
+<table>
+<tr><td>尺寸</td><td>{torrent.size_number} {torrent.size_unit} (1,610,612,736 字节)</td></tr>
+<tr><td>活跃用户</td><td>{torrent.seeders} 做种者，{torrent.leechers} 下载者</td></tr>
+</table>
+{promotion}{hit_and_run}
+</td></tr></table>
+</body></html>'''
+
+def ttg_tasks(torrents: List[SyntheticTorrent]) -> str:
+    rows = '\n'.join(
+        f'<tr><td><img src="/pic/cat_movie.gif" alt="Movie"/></td><td><a href="details.php?id={torrent.torrent_id}"><b>{torrent.name}</b></a></td></tr>'
+        for torrent in torrents
+    )
+    table = f'<table><tr><td>类型</td><td>名称</td></tr>\n{rows}</table>'
+    return f'''<html><head><title>用户详情</title></head><body><table>
+<tr><td>当前上传</td><td>{table}</td></tr>
+<tr><td>当前下载</td><td>{table}</td></tr>
+</table></body></html>'''
+
+# mteam
+
+MTEAM_DISCOUNTS: Dict[Tuple[float, float], str] = {(1, 0): 'FREE', (1, 0.5): 'PERCENT_50', (1, 0.3): 'PERCENT_70'}
+
+def mteam_item(torrent: SyntheticTorrent) -> Dict[str, object]:
+    return {
+        'id': torrent.torrent_id,
+        'name': torrent.name,
+        'smallDescr': 'synthetic subtitle',
+        'size': str(int(float(torrent.size_number) * 1024 ** (3 if torrent.size_unit == 'GB' else 2))),
+        'status': {
+            'seeders': str(torrent.seeders),
+            'leechers': str(torrent.leechers),
+            'discount': MTEAM_DISCOUNTS.get((torrent.upload_ratio, torrent.download_ratio), 'NORMAL'),
+        },
+    }
+
+def mteam_user() -> Dict[str, object]:
+    member_count = {'uploaded': str(1024 ** 4), 'downloaded': str(512 * 1024 ** 3), 'bonus': '1234.5'}
+    data = {'id': USER_ID, 'username': USER_NAME, 'email': EMAIL, 'memberCount': member_count}
+    return {'code': '0', 'message': 'SUCCESS', 'data': data}
+
+def mteam_torrents(torrents: List[SyntheticTorrent]) -> Dict[str, object]:
+    items = [mteam_item(torrent) for torrent in torrents]
+    return {'code': '0', 'message': 'SUCCESS', 'data': {'pageNumber': '1', 'pageSize': '100', 'data': items}}
+
+def mteam_tasks(torrents: List[SyntheticTorrent]) -> Dict[str, object]:
+    items = [{'torrent': {'id': torrent.torrent_id, 'name': torrent.name}} for torrent in torrents]
+    return {'code': '0', 'message': 'SUCCESS', 'data': {'data': items, 'pageNumber': 1, 'totalPages': 1}}
+
+# fsm
+
+def fsm_item(torrent: SyntheticTorrent) -> Dict[str, object]:
+    return {
+        'tid': int(torrent.torrent_id),
+        'title': torrent.name,
+        'fileSize': f'{torrent.size_number} {torrent.size_unit}',
+        'peers': {'upload': torrent.seeders, 'download': torrent.leechers},
+        'status': {'upCoefficient': torrent.upload_ratio, 'downCoefficient': torrent.download_ratio},
+    }
+
+def fsm_user() -> Dict[str, object]:
+    data = {'upload': 1024 ** 4, 'download': 512 * 1024 ** 3, 'uid': int(USER_ID), 'username': USER_NAME, 'point': 1234.5, 'passkey': PASSKEY}
+    return {'success': True, 'data': data}
+
+def fsm_tasks(torrents: List[SyntheticTorrent]) -> Dict[str, object]:
+    items = [{'tid': torrent.torrent_id, 'title': torrent.name} for torrent in torrents]
+    return {'success': True, 'data': {'list': items, 'maxPage': 1}}
+
+# entry points
+
+def build_page(crawler_class: Type[Crawler], kind: str, torrents: List[SyntheticTorrent]) -> bytes:
+    """
+    builds the synthetic `kind` page of a crawler, a detail page shows the first torrent.
+    """
+
+    pages: Dict[str, Callable[[], object]]
+    if issubclass(crawler_class, NexusPHP):
+        pages = {
+            'user': lambda: nexusphp_user(crawler_class),
+            'torrents': lambda: nexusphp_torrents(crawler_class, torrents),
+            'detail': lambda: nexusphp_detail(crawler_class, torrents[0]),
+            'tasks': lambda: nexusphp_tasks(torrents),
+        }
+    elif issubclass(crawler_class, TTG):
+        pages = {
+            'user': ttg_user,
+            'torrents': lambda: ttg_torrents(torrents),
+            'detail': lambda: ttg_detail(torrents[0]),
+            'tasks': lambda: ttg_tasks(torrents),
+        }
+    elif issubclass(crawler_class, MTeam):
+        pages = {
+            'user': mteam_user,
+            'torrents': lambda: mteam_torrents(torrents),
+            'detail': lambda: {'code': '0', 'message': 'SUCCESS', 'data': mteam_item(torrents[0])},
+            'tasks': lambda: mteam_tasks(torrents),
+        }
+    elif issubclass(crawler_class, FSM):
+        pages = {
+            'user': fsm_user,
+            'torrents': lambda: {'success': True, 'data': {'list': [fsm_item(torrent) for torrent in torrents], 'maxPage': 100}},
+            'detail': lambda: {'success': True, 'data': {'torrent': fsm_item(torrents[0])}},
+            'tasks': lambda: fsm_tasks(torrents),
+        }
+    else:
+        raise ValueError(f'no synthetic pages for {crawler_class.__name__}')
+
+    page = pages[kind]()
+    return page.encode('utf8') if isinstance(page, str) else dumps(page, ensure_ascii=False).encode('utf8')
+
+def route(crawler_class: Type[Crawler], path: str) -> Optional[str]:
+    """
+    returns the kind of the page which a crawler requests with `path`, or `None` if it is not a page of a fixture.
+    """
+
+    path = '/' + path.lstrip('/')
+    if issubclass(crawler_class, NexusPHP):
+        routes = {
+            '/usercp.php': 'user',
+            '/torrents.php': 'torrents',
+            crawler_class.detail_path: 'detail',
+            '/getusertorrentlistajax.php': 'tasks',
+            '/getusertorrentlist.php': 'tasks',
+        }
+    elif issubclass(crawler_class, TTG):
+        routes = {'/my.php': 'user', '/browse.php': 'torrents', '/userdetails.php': 'tasks'}
+        if path.startswith('/t/'):
+            return 'detail'
+    elif issubclass(crawler_class, MTeam):
+        routes = {
+            '/api/member/profile': 'user',
+            '/api/torrent/search': 'torrents',
+            '/api/torrent/detail': 'detail',
+            '/api/member/getUserTorrentList': 'tasks',
+        }
+    elif issubclass(crawler_class, FSM):
+        routes = {
+            '/Users/infos': 'user',
+            '/Torrents/listTorrents': 'torrents',
+            '/Torrents/details': 'detail',
+            '/Torrents/listMyDownload': 'tasks',
+            '/Torrents/listMySeed': 'tasks',
+        }
+    else:
+        return None
+    return routes.get(path)
+
+def fixture_path(crawler_class: Type[Crawler], kind: str) -> str:
+    return join(FIXTURES_DIRECTORY, crawler_class.__name__, kind)
+
+def load_fixtures(crawler_class: Type[Crawler], rows: int = 100) -> Dict[str, bytes]:
+    """
+    returns the pages of every kind of a crawler, the recorded page if there is one, otherwise a synthetic page.
+    """
+
+    torrents = synthetic_torrents(rows)
+    fixtures = {}
+    for kind in KINDS:
+        path = fixture_path(crawler_class, kind)
+        if exists(path):
+            with open(path, 'rb') as file:
+                fixtures[kind] = file.read()
+        else:
+            fixtures[kind] = build_page(crawler_class, kind, torrents)
+    return fixtures
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+measures the time a fresh interpreter spends importing the package, and a single crawler class of it.
+
+usage: python -m benchmarks.import_time [--repeat 10]
+"""
+
+from argparse import ArgumentParser
+from statistics import median
+from subprocess import run
+from sys import executable
+
+STATEMENTS = [
+    'import crawlers',
+    'from crawlers import MTeam',
+    'from crawlers import CHDBits',
+    'from crawlers import ' + ', '.join(['CHDBits', 'MTeam', 'FSM', 'TTG', 'PTerClub', 'RedLeaves', 'OpenCD', 'OurBits', 'U2', 'UBits', 'LemonHD']),
+]
+
+def measure(statement: str) -> float:
+    script = f'from time import perf_counter\nstart = perf_counter()\n{statement}\nprint(perf_counter() - start)'
+    return float(run([executable, '-c', script], capture_output=True, check=True, text=True).stdout)
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10, help='the number of fresh interpreters per statement')
+    arguments = parser.parse_args()
+
+    for statement in STATEMENTS:
+        seconds = median(measure(statement) for _ in range(arguments.repeat))
+        print(f'{seconds * 1000:>8.1f}ms  {statement}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+load tests a crawler against the local mock tracker and reports the throughput and the p50/p99 latency of its calls.
+
+usage: python -m benchmarks.load [--crawler OurBits] [--method torrents] [--calls 500] [--workers 8] [--latency 0.02]
+"""
+
+from math import inf
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sized, Tuple
+
+from crawlers import Crawler
+from crawlers.session import RetryPolicy
+
+from benchmarks.parsers import CRAWLERS
+from benchmarks.tracker import Tracker
+from benchmarks.tracker import FIRST_TORRENT_ID
+
+def methods(crawler: Crawler, pages: int) -> Dict[str, Callable[[int], Any]]:
+    return {
+        'torrents': lambda index: crawler.run(crawler.torrents_page_flow(index % pages)),
+        'torrent': lambda index: crawler.get_torrent(str(FIRST_TORRENT_ID + index)),
+        'user': lambda index: crawler.get_user(),
+        'tasks': lambda index: crawler.run(crawler.tasks_flow()),
+        'download': lambda index: crawler.fetch_torrent_bytes(str(FIRST_TORRENT_ID + index)),
+    }
+
+def call(function: Callable[[int], Any], index: int) -> Tuple[float, int, str]:
+    """
+    returns the seconds, the number of rows and the name of the raised exception, if any, of one call.
+    """
+
+    started = perf_counter()
+    try:
+        result = function(index)
+    except Exception as exception: # pylint: disable=broad-exception-caught
+        return perf_counter() - started, 0, type(exception).__name__
+    rows = len(result) if isinstance(result, Sized) and not isinstance(result, bytes) else 1
+    return perf_counter() - started, rows, ''
+
+def report(latencies: List[float], rows: int, errors: Counter, seconds: float, statuses: Counter) -> None:
+    cuts = quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f'calls      {len(latencies)} in {seconds:.2f}s, {len(latencies) / seconds:.1f} calls/s, {rows / seconds:.1f} rows/s')
+    print(f'latency    p50 {cuts[49] * 1000:.1f}ms, p99 {cuts[98] * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms')
+    print(f'errors     {dict(errors) or "none"}')
+    if statuses:
+        print(f'statuses   {dict(sorted(statuses.items()))}')
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--crawler', default='OurBits', choices=[crawler_class.__name__ for crawler_class in CRAWLERS])
+    parser.add_argument('--method', default='torrents', choices=['torrents', 'torrent', 'user', 'tasks', 'download'])
+    parser.add_argument('--calls', type=int, default=500, help='the number of calls')
+    parser.add_argument('--workers', type=int, default=8, help='the number of threads sharing one crawler')
+    parser.add_argument('--qps', type=float, default=inf, help='the qps of the crawler')
+    parser.add_argument('--burst', type=int, default=1, help='the burst of the crawler')
+    parser.add_argument('--attempts', type=int, default=1, help='the attempts of the retry policy of the crawler, 1 disables retries')
+    parser.add_argument('--backoff', type=float, default=0.5, help='the base backoff seconds of the retry policy')
+    parser.add_argument('--adaptive', action='store_true', help='adapt the qps of the crawler to the responses, starting from --qps')
+    parser.add_argument('--max-qps', type=float, default=None, help='the hard ceiling of the adaptive qps')
+    parser.add_argument('--rows', type=int, default=100, help='the number of torrents of a page')
+    parser.add_argument('--pages', type=int, default=10, help='the number of pages of the torrent list')
+    parser.add_argument('--latency', type=float, default=0.02, help='the seconds every request waits')
+    parser.add_argument('--jitter', type=float, default=0.01, help='the maximum of the random seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='the probability of answering with a 500')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='the probability of answering with a 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='the Retry-After seconds of a 429')
+    parser.add_argument('--limit-qps', type=float, default=inf, help='the tracker answers with 429 above this many requests per second')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--base-url', default='', help='a tracker started by `python -m benchmarks.tracker`, instead of one in this process')
+    arguments = parser.parse_args()
+
+    crawler_class = next(crawler_class for crawler_class in CRAWLERS if crawler_class.__name__ == arguments.crawler)
+    tracker = Tracker(
+        crawler_class,
+        rows=arguments.rows,
+        pages=arguments.pages,
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        error_rate=arguments.error_rate,
+        throttle_rate=arguments.throttle_rate,
+        retry_after=arguments.retry_after,
+        limit_qps=arguments.limit_qps,
+        seed=arguments.seed
+    )
+
+    if not arguments.base_url:
+        tracker.start()
+    base_url = arguments.base_url or tracker.base_url
+
+    try:
+        retry = RetryPolicy(attempts=arguments.attempts, backoff=arguments.backoff) if arguments.attempts > 1 else None
+        crawler = crawler_class(
+            headers={'Cookie': 'anonymous'},
+            base_url=base_url,
+            qps=arguments.qps,
+            burst=arguments.burst,
+            retry=retry,
+            adaptive=arguments.adaptive,
+            max_qps=arguments.max_qps
+        )
+        function = methods(crawler, arguments.pages)[arguments.method]
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=arguments.workers) as executor:
+            results = list(executor.map(lambda index: call(function, index), range(arguments.calls)))
+        seconds = perf_counter() - started
+    finally:
+        tracker.stop()
+
+    print(f'{crawler_class.__name__} {arguments.method}, {arguments.workers} workers, qps {arguments.qps:g}, {base_url}')
+    if crawler.session.adaptive is not None:
+        print(f'learned    {crawler.session.adaptive.qps:.2f} qps')
+    report(
+        [latency for latency, _, _ in results],
+        sum(rows for _, rows, _ in results),
+        Counter(error for _, _, error in results if error),
+        seconds,
+        tracker.statuses
+    )
+
+if __name__ == '__main__':
+    main()
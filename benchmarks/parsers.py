@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+measures the parsers of every crawler against recorded or synthetic pages, without any network.
+
+usage: python -m benchmarks.parsers [--rows 100] [--number 20] [--crawler CHDBits]
+       python -m benchmarks.parsers record CHDBits < headers.txt
+"""
+
+from io import BytesIO
+from os import makedirs
+from re import escape
+from re import sub
+from sys import stdin
+from argparse import ArgumentParser
+from argparse import Namespace
+from time import perf_counter
+from tracemalloc import start
+from tracemalloc import stop
+from tracemalloc import reset_peak
+from tracemalloc import get_traced_memory
+from typing import Any, Callable, Dict, List, Sized, Type
+from urllib.parse import urlparse
+
+from requests import Response
+
+from crawlers import Crawler
+from crawlers import CHDBits, MTeam, FSM, TTG, PTerClub, RedLeaves, OpenCD, OurBits, U2, UBits, LemonHD
+from crawlers.base import Flow, User
+
+from benchmarks.fixtures import EMAIL, PASSKEY, USER_ID, USER_NAME
+from benchmarks.fixtures import fixture_path, load_fixtures, route, synthetic_torrents
+
+CRAWLERS: List[Type[Crawler]] = [CHDBits, MTeam, FSM, TTG, PTerClub, RedLeaves, OpenCD, OurBits, U2, UBits, LemonHD]
+
+def build_response(content: bytes) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.encoding = 'utf8'
+    response.raw = BytesIO(content)
+    return response
+
+def replay(crawler: Crawler, flow: Flow[Any], fixtures: Dict[str, bytes]) -> Any:
+    """
+    drives a flow, answering every request with the fixture of its path.
+    """
+
+    try:
+        request = next(flow)
+        while True:
+            kind = route(type(crawler), urlparse(request.url).path)
+            if kind is None:
+                raise RuntimeError(f'no fixture for {request.url}')
+            request = flow.send(build_response(fixtures[kind]))
+    except StopIteration as stop_iteration:
+        return stop_iteration.value
+
+def measure(function: Callable[[], Any], number: int) -> Dict[str, float]:
+    rows = 1
+    started = perf_counter()
+    for _ in range(number):
+        result = function()
+        rows = len(result) if isinstance(result, Sized) else 1
+    seconds = (perf_counter() - started) / number
+
+    start()
+    try:
+        reset_peak()
+        function()
+        _, peak = get_traced_memory()
+    finally:
+        stop()
+
+    return {'rows': rows, 'seconds': seconds, 'peak': peak}
+
+def benchmark(arguments: Namespace) -> None:
+    crawler_classes = [crawler_class for crawler_class in CRAWLERS if not arguments.crawler or crawler_class.__name__ in arguments.crawler]
+
+    print(f'{"crawler":<12}{"method":<14}{"rows":>6}{"per call":>12}{"rows/s":>12}{"peak":>12}')
+    for crawler_class in crawler_classes:
+        crawler = crawler_class(headers={'Cookie': 'anonymous'}, trusted=arguments.trusted)
+        fixtures = load_fixtures(crawler_class, arguments.rows)
+        torrent_id = synthetic_torrents(1)[0].torrent_id
+
+        methods: Dict[str, Callable[[], Any]] = {
+            'get_torrents': lambda: replay(crawler, crawler.torrents_page_flow(0), fixtures), # pylint: disable=cell-var-from-loop
+            'get_torrent': lambda: replay(crawler, crawler.torrent_flow(torrent_id), fixtures), # pylint: disable=cell-var-from-loop
+            'get_user': lambda: replay(crawler, crawler.user_flow(), fixtures), # pylint: disable=cell-var-from-loop
+            'get_tasks': lambda: replay(crawler, crawler.tasks_flow(), fixtures), # pylint: disable=cell-var-from-loop
+        }
+
+        for method, function in methods.items():
+            crawler.user_cache = None
+            result = measure(function, arguments.number)
+            print(
+                f'{crawler_class.__name__:<12}{method:<14}{result["rows"]:>6}'
+                f'{result["seconds"] * 1000:>10.2f}ms{result["rows"] / result["seconds"]:>12.0f}{result["peak"] / 1024:>9.0f}KiB'
+            )
+
+def anonymize(content: bytes, user: User) -> bytes:
+    """
+    replaces the user name, email, passkey and user id of the recording account with placeholders.
+    """
+
+    replacements = [(user.user_name, USER_NAME), (user.email, EMAIL), (user.passkey, PASSKEY)]
+    for value, placeholder in replacements:
+        if value:
+            content = content.replace(value.encode('utf8'), placeholder.encode('utf8'))
+
+    user_id = escape(user.user_id).encode('utf8')
+    content = sub(rb'([?&;]id=)' + user_id + rb'\b', rb'\g<1>' + USER_ID.encode('utf8'), content)
+    return sub(rb'("(?:id|uid)"\s*:\s*"?)' + user_id + rb'\b', rb'\g<1>' + USER_ID.encode('utf8'), content)
+
+def record(arguments: Namespace) -> None:
+    """
+    fetches the pages of a site with the headers read from stdin, one `key: value` per line, and saves them
+    anonymized as the fixtures of the crawler.
+    """
+
+    crawler_class = next(crawler_class for crawler_class in CRAWLERS if crawler_class.__name__ == arguments.site)
+    headers = dict(line.split(': ', 1) for line in stdin.read().splitlines() if line)
+    crawler = crawler_class(headers=headers, proxy=arguments.proxy)
+
+    recorded: Dict[str, bytes] = {}
+
+    def recording(flow: Flow[Any]) -> Any:
+        try:
+            request = next(flow)
+            while True:
+                response = crawler.session.request(request.method, request.url, **request.kwargs)
+                kind = route(crawler_class, urlparse(request.url).path)
+                if kind is not None:
+                    recorded.setdefault(kind, response.content)
+                request = flow.send(response)
+        except StopIteration as stop_iteration:
+            return stop_iteration.value
+
+    user = recording(crawler.user_flow())
+    torrents = recording(crawler.torrents_page_flow(0))
+    if torrents:
+        recording(crawler.torrent_flow(torrents[0].torrent_id))
+    recording(crawler.tasks_flow())
+
+    makedirs(fixture_path(crawler_class, ''), exist_ok=True)
+    for kind, content in recorded.items():
+        with open(fixture_path(crawler_class, kind), 'wb') as file:
+            file.write(anonymize(content, user))
+        print(f'recorded {fixture_path(crawler_class, kind)}')
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100, help='the number of rows of a synthetic page')
+    parser.add_argument('--number', type=int, default=20, help='the number of calls measured per method')
+    parser.add_argument('--crawler', action='append', help='only measure this crawler, can be repeated')
+    parser.add_argument('--trusted', action='store_true', help='build the models without validation')
+    parser.set_defaults(command=benchmark)
+
+    subparsers = parser.add_subparsers()
+    record_parser = subparsers.add_parser('record', help='record the anonymized pages of a site as fixtures')
+    record_parser.add_argument('site', choices=[crawler_class.__name__ for crawler_class in CRAWLERS])
+    record_parser.add_argument('--proxy', default=None, help='the proxy of the requests')
+    record_parser.set_defaults(command=record)
+
+    arguments = parser.parse_args()
+    arguments.command(arguments)
+
+if __name__ == '__main__':
+    main()
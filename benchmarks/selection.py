@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+measures how long it takes to rank torrents of many pages, with `crawlers.selection` and with a plain python loop.
+
+usage: python -m benchmarks.selection [--candidates 50000]
+"""
+
+from argparse import ArgumentParser
+from random import Random
+from timeit import repeat
+from typing import List
+
+from crawlers import CHDBits
+from crawlers.base import Promotion, Torrent, TorrentBatch
+from crawlers.selection import select
+
+def build_batches(candidates: int, page_size: int = 100) -> List[TorrentBatch]:
+    crawler = CHDBits(headers={})
+    random = Random(0)
+    torrents = [
+        Torrent(
+            torrent_id=str(index),
+            torrent_name=f'torrent {index}',
+            size=random.randint(1, 100) * 1024 ** 3,
+            seeders=random.randint(0, 200),
+            leechers=random.randint(0, 50),
+            hit_and_run=random.choice([0, 0, 0, 3 * 24 * 3600]),
+            promotion=Promotion.intern(upload_ratio=random.choice([1, 2]), download_ratio=random.choice([0, 0.5, 1])),
+            crawler=crawler
+        )
+        for index in range(candidates)
+    ]
+    return [TorrentBatch(crawler, torrents[start:start + page_size]) for start in range(0, candidates, page_size)]
+
+def select_in_python(batches: List[TorrentBatch], count: int) -> List[Torrent]:
+    torrents = [
+        torrent for batch in batches for torrent in batch
+        if torrent.promotion.download_ratio == 0 and torrent.hit_and_run == 0
+    ]
+    torrents.sort(
+        key=lambda torrent: torrent.leechers / (torrent.seeders + 1) * torrent.promotion.upload_ratio / (torrent.size / 1024 ** 3),
+        reverse=True
+    )
+    return torrents[:count]
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--candidates', type=int, default=50000, help='the number of torrents to rank')
+    parser.add_argument('--count', type=int, default=20, help='the number of torrents to select')
+    parser.add_argument('--repeat', type=int, default=5, help='the best of how many runs is reported')
+    arguments = parser.parse_args()
+
+    batches = build_batches(arguments.candidates)
+    vectorized = min(repeat(lambda: select(batches, arguments.count, free_only=True, no_hit_and_run=True), number=1, repeat=arguments.repeat))
+    python = min(repeat(lambda: select_in_python(batches, arguments.count), number=1, repeat=arguments.repeat))
+
+    print(f'{arguments.candidates} candidates, top {arguments.count}')
+    print(f'numpy   {vectorized * 1000:>10.1f}ms')
+    print(f'python  {python * 1000:>10.1f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+a local stand-in of a private tracker, serving the synthetic pages of a crawler with configurable latency, errors,
+429 responses and page counts. every crawler can target it through `base_url`.
+
+usage: python -m benchmarks.tracker CHDBits [--port 8000] [--latency 0.05] [--throttle-rate 0.1]
+"""
+
+from re import match
+from sys import exc_info
+from json import dumps
+from json import loads
+from math import inf
+from time import sleep
+from time import monotonic
+from random import Random
+from threading import Lock
+from threading import Thread
+from argparse import ArgumentParser
+from collections import Counter
+from collections import deque
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from typing import Any, Deque, Dict, Optional, Tuple, Type
+
+from crawlers import Crawler
+from crawlers import TTG, MTeam, FSM
+
+from benchmarks.fixtures import build_page, route, synthetic_torrents
+from benchmarks.parsers import CRAWLERS
+
+FIRST_TORRENT_ID = int(synthetic_torrents(1)[0].torrent_id)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: 'TrackerServer'
+
+    def do_GET(self) -> None: # pylint: disable=invalid-name
+        self.handle_request({})
+
+    def do_POST(self) -> None: # pylint: disable=invalid-name
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf8') if length else ''
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            form = loads(body or '{}')
+        else:
+            form = {key: values[0] for key, values in parse_qs(body).items()}
+        self.handle_request(form)
+
+    def handle_request(self, form: Dict[str, Any]) -> None:
+        tracker = self.server.tracker
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        status, headers, content = tracker.respond(url.path, {**query, **form}, self.headers.get('Host', ''))
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args: Any) -> None: # pylint: disable=arguments-differ
+        pass
+
+class TrackerServer(ThreadingHTTPServer):
+    daemon_threads = True
+    tracker: 'Tracker'
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # clients drop keep-alive connections whenever they close a response without reading it, e.g. before a retry
+        if not isinstance(exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class Tracker:
+    """
+    serves the pages of `crawler_class`, each list has `pages` pages of `rows` torrents.
+
+    every request waits `latency` plus up to `jitter` seconds, then is answered with 429 and a `Retry-After` of
+    `retry_after` seconds with a probability of `throttle_rate` or if more than `limit_qps` requests arrived in the
+    last second, or with `error_status` with a probability of `error_rate`. the counts of the answered statuses are
+    kept in `statuses`.
+    """
+
+    def __init__(
+        self,
+        crawler_class: Type[Crawler],
+        rows: int = 100,
+        pages: int = 10,
+        *,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        error_status: int = HTTPStatus.INTERNAL_SERVER_ERROR,
+        throttle_rate: float = 0,
+        retry_after: float = 1,
+        limit_qps: float = inf,
+        seed: Optional[int] = None,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ) -> None:
+        self.crawler_class = crawler_class
+        self.rows = rows
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.limit_qps = limit_qps
+        self.arrivals: Deque[float] = deque()
+        self.host = host
+        self.random = Random(seed)
+        self.statuses: Counter = Counter()
+        self.lock = Lock()
+        self.cache: Dict[Tuple[str, int], bytes] = {}
+
+        self.server = TrackerServer((host, port), Handler)
+        self.server.tracker = self
+        self.thread: Optional[Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.server.server_address[1]}'
+
+    def start(self) -> 'Tracker':
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+
+    def __enter__(self) -> 'Tracker':
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def respond(self, path: str, parameters: Dict[str, Any], host: str) -> Tuple[int, Dict[str, str], bytes]:
+        delay = self.latency + self.random.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay:
+            sleep(delay)
+
+        if self.random.random() < self.throttle_rate or self.over_limit():
+            return self.count(HTTPStatus.TOO_MANY_REQUESTS, {'Retry-After': f'{self.retry_after:g}'}, b'too many requests')
+        if self.random.random() < self.error_rate:
+            return self.count(self.error_status, {}, b'injected error')
+
+        path = '/' + path.lstrip('/')
+        if path in ('/download.php', '/Torrents/download') or path.startswith('/dl/'):
+            torrent_id = self.torrent_id(path, parameters)
+            if torrent_id is None:
+                return self.count(HTTPStatus.NOT_FOUND, {}, b'not found')
+            content = f'd4:name{len(torrent_id)}:{torrent_id}e'.encode('utf8')
+            return self.count(HTTPStatus.OK, {'Content-Type': 'application/x-bittorrent'}, content)
+
+        if path == '/api/torrent/genDlToken':
+            payload = {'code': '0', 'message': 'SUCCESS', 'data': f'http://{host}/download.php?id={parameters.get("id")}'}
+            return self.count(HTTPStatus.OK, {'Content-Type': 'application/json'}, dumps(payload).encode('utf8'))
+
+        kind = route(self.crawler_class, path)
+        if kind is None:
+            return self.count(HTTPStatus.NOT_FOUND, {}, b'not found')
+
+        if kind == 'torrents':
+            content = self.torrents_page(self.page(parameters))
+        elif kind == 'detail':
+            torrent_id = self.torrent_id(path, parameters)
+            if torrent_id is None:
+                return self.count(HTTPStatus.NOT_FOUND, {}, b'not found')
+            content = build_page(self.crawler_class, kind, synthetic_torrents(1, start=int(torrent_id) - FIRST_TORRENT_ID))
+        else:
+            content = self.cached(kind, 0, lambda: build_page(self.crawler_class, kind, synthetic_torrents(self.rows)))
+
+        content_type = 'application/json' if issubclass(self.crawler_class, (MTeam, FSM)) else 'text/html; charset=utf-8'
+        return self.count(HTTPStatus.OK, {'Content-Type': content_type}, content)
+
+    def over_limit(self) -> bool:
+        now = monotonic()
+        with self.lock:
+            while self.arrivals and self.arrivals[0] <= now - 1:
+                self.arrivals.popleft()
+            if len(self.arrivals) >= self.limit_qps:
+                return True
+            self.arrivals.append(now)
+            return False
+
+    def count(self, status: int, headers: Dict[str, str], content: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        with self.lock:
+            self.statuses[int(status)] += 1
+        return status, headers, content
+
+    def cached(self, kind: str, page: int, build: Any) -> bytes:
+        content = self.cache.get((kind, page))
+        if content is None:
+            content = self.cache[(kind, page)] = build()
+        return content
+
+    def page(self, parameters: Dict[str, Any]) -> int:
+        """
+        returns the zero based page a list request asks for, mteam and fsm count pages from one.
+        """
+
+        if issubclass(self.crawler_class, MTeam):
+            return int(parameters.get('pageNumber', 1)) - 1
+        if issubclass(self.crawler_class, FSM):
+            return int(parameters.get('page', 1)) - 1
+        return int(parameters.get('page', 0))
+
+    def torrents_page(self, page: int) -> bytes:
+        if page >= self.pages and issubclass(self.crawler_class, MTeam):
+            return dumps({'code': '1', 'message': 'no more torrents', 'data': None}).encode('utf8')
+
+        rows = self.rows if 0 <= page < self.pages else 0
+        return self.cached('torrents', page, lambda: build_page(self.crawler_class, 'torrents', synthetic_torrents(rows, start=page * self.rows)))
+
+    def torrent_id(self, path: str, parameters: Dict[str, Any]) -> Optional[str]:
+        if issubclass(self.crawler_class, TTG) and path.startswith(('/t/', '/dl/')):
+            result = match(r'/(t|dl)/(?P<torrent_id>\d+)/', path)
+            torrent_id = result.group('torrent_id') if result else None
+        elif issubclass(self.crawler_class, FSM):
+            torrent_id = parameters.get('tid')
+        else:
+            torrent_id = parameters.get('id')
+
+        if torrent_id is None or not str(torrent_id).isdigit() or int(torrent_id) < FIRST_TORRENT_ID:
+            return None
+        return str(torrent_id)
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('crawler', choices=[crawler_class.__name__ for crawler_class in CRAWLERS])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rows', type=int, default=100, help='the number of torrents of a page')
+    parser.add_argument('--pages', type=int, default=10, help='the number of pages of the torrent list')
+    parser.add_argument('--latency', type=float, default=0, help='the seconds every request waits')
+    parser.add_argument('--jitter', type=float, default=0, help='the maximum of the random seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='the probability of answering with --error-status')
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--throttle-rate', type=float, default=0, help='the probability of answering with 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='the Retry-After seconds of a 429')
+    parser.add_argument('--limit-qps', type=float, default=inf, help='answer with 429 above this many requests per second')
+    parser.add_argument('--seed', type=int, default=None)
+    arguments = parser.parse_args()
+
+    crawler_class = next(crawler_class for crawler_class in CRAWLERS if crawler_class.__name__ == arguments.crawler)
+    tracker = Tracker(
+        crawler_class,
+        rows=arguments.rows,
+        pages=arguments.pages,
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        error_rate=arguments.error_rate,
+        error_status=arguments.error_status,
+        throttle_rate=arguments.throttle_rate,
+        retry_after=arguments.retry_after,
+        limit_qps=arguments.limit_qps,
+        seed=arguments.seed,
+        host=arguments.host,
+        port=arguments.port
+    )
+    print(f'serving {crawler_class.__name__} pages on {tracker.base_url}, stop with ctrl-c')
+    try:
+        tracker.server.serve_forever()
+    except KeyboardInterrupt:
+        tracker.server.server_close()
+
+if __name__ == '__main__':
+    main()
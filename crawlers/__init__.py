@@ -1,19 +1,59 @@
-from .base import Crawler
-from .base import Torrent
-from .base import Promotion
-
-from .chdbits import CHDBits
-from .mteam import MTeam
-from .fsm import FSM
-from .ttg import TTG
-from .pterclub import PTerClub
-from .redleaves import RedLeaves
-from .opencd import OpenCD
-from .ourbits import OurBits
-from .u2 import U2
-from .ubits import UBits
-from .lemonhd import LemonHD
+from typing import Any
+from typing import List
+from typing import TYPE_CHECKING
+from importlib import import_module
+
+if TYPE_CHECKING:
+    from .base import Crawler
+    from .base import Torrent
+    from .base import Promotion
+    from .base import TorrentBatch
+    from .nexusphp import NexusPHP
+
+    from .chdbits import CHDBits
+    from .mteam import MTeam
+    from .fsm import FSM
+    from .ttg import TTG
+    from .pterclub import PTerClub
+    from .redleaves import RedLeaves
+    from .opencd import OpenCD
+    from .ourbits import OurBits
+    from .u2 import U2
+    from .ubits import UBits
+    from .lemonhd import LemonHD
 
 VERSION = '1.0.12'
 
 __all__ = ['VERSION']
+
+# the site modules pull in requests, pydantic and lxml, so they are only imported when a class is first accessed.
+lazy_attributes = {
+    'Crawler': 'base',
+    'Torrent': 'base',
+    'Promotion': 'base',
+    'TorrentBatch': 'base',
+    'NexusPHP': 'nexusphp',
+    'CHDBits': 'chdbits',
+    'MTeam': 'mteam',
+    'FSM': 'fsm',
+    'TTG': 'ttg',
+    'PTerClub': 'pterclub',
+    'RedLeaves': 'redleaves',
+    'OpenCD': 'opencd',
+    'OurBits': 'ourbits',
+    'U2': 'u2',
+    'UBits': 'ubits',
+    'LemonHD': 'lemonhd',
+}
+
+def __getattr__(name: str) -> Any:
+    module_name = lazy_attributes.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(lazy_attributes))
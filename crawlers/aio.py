@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+from math import inf
+from time import monotonic
+from asyncio import sleep
+from asyncio import Future
+from asyncio import ensure_future
+from asyncio import gather
+from asyncio import Semaphore
+from asyncio import TimeoutError as AsyncTimeoutError
+from os import makedirs
+from collections import deque
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from functools import partial
+from types import TracebackType
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Type
+from typing import Tuple
+from typing import Optional
+from typing import Deque
+from typing import AsyncIterator
+from typing import Iterable
+from typing import Union
+from typing import Literal
+from typing import overload
+
+from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import ClientResponse
+from aiohttp import ClientConnectionError
+from aiohttp import ClientConnectorError
+from yarl import URL
+from requests import Response
+from requests import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .base import T
+from .base import Flow
+from .base import PageFlow
+from .base import Crawler
+from .base import User
+from .base import Torrent
+from .base import TorrentBatch
+from .base import Task
+from .base import DownloadResult
+from .base import DownloadStatus
+from .base import AtomicFile
+from .base import plan_downloads
+from .session import TokenBucket
+from .session import RetryPolicy
+from .session import AdaptiveRate
+from .exceptions import RequestException
+from .exceptions import CannotGetTorrentInformationException
+from .exceptions import TorrentTooLargeException
+
+try:
+    from aiohttp import ConnectionTimeoutError # pylint: disable=ungrouped-imports
+    CONNECT_ERRORS: Tuple[Type[BaseException], ...] = (ClientConnectorError, ConnectionTimeoutError)
+except ImportError: # pragma: no cover
+    # aiohttp before 3.10 raises the same ServerTimeoutError for connect and read timeouts
+    CONNECT_ERRORS = (ClientConnectorError,)
+
+def is_connect_error(exception: Optional[BaseException]) -> bool:
+    """
+    returns whether a request of `aiohttp` failed while connecting, before anything was sent to the server.
+    """
+
+    return isinstance(exception, CONNECT_ERRORS)
+
+def build_response(response: ClientResponse, content: bytes) -> Response:
+    result = Response()
+    result.status_code = response.status
+    result.reason = response.reason or ''
+    result.url = str(response.url)
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.encoding = get_encoding_from_headers(result.headers)
+    result._content = content # pylint: disable=protected-access
+    result._content_consumed = True # type: ignore # pylint: disable=protected-access
+    return result
+
+class AsyncSession:
+    """
+    the asyncio counterpart of `crawlers.session.Session`, it has the same qps, proxy and timeout semantics and
+    returns `requests.Response` objects, so the crawler flows can not tell the difference. `timeout` applies to
+    connecting and to every read, like the timeout of `requests`, `None` waits forever.
+    """
+
+    def __init__(
+        self,
+        qps: float = inf,
+        burst: int = 1,
+        timeout: Optional[float] = None,
+        limiter: Optional[TokenBucket] = None,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        retry: Optional[RetryPolicy] = None,
+        adaptive: Optional[AdaptiveRate] = None
+    ) -> None:
+        self.limiter = limiter or TokenBucket(qps=qps, burst=burst)
+        self.retry = retry
+        self.adaptive = adaptive
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.proxy = proxy
+        self.session: Optional[ClientSession] = None
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[ClientResponse]:
+        await sleep(self.limiter.reserve())
+        async with self.send(method, url, **kwargs) as response:
+            yield response
+
+    @asynccontextmanager
+    async def send(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[ClientResponse]:
+        """
+        sends a request without waiting for the limiter, the caller has taken a token already.
+        """
+
+        if self.session is None:
+            self.session = ClientSession(headers=self.headers)
+
+        prepared_request = PreparedRequest()
+        prepared_request.prepare_url(url, kwargs.pop('params', None))
+        timeout = kwargs.pop('timeout', self.timeout)
+        kwargs.pop('stream', None)
+        kwargs.pop('idempotent', None)
+
+        async with self.session.request(
+            method,
+            URL(prepared_request.url or url, encoded=True),
+            proxy=self.proxy,
+            timeout=ClientTimeout(sock_connect=timeout, sock_read=timeout),
+            **kwargs
+        ) as response:
+            yield response
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        idempotent = kwargs.pop('idempotent', None)
+        retry = 0
+        while True:
+            await sleep(self.limiter.reserve())
+            try:
+                started = monotonic()
+                async with self.send(method, url, **kwargs) as response:
+                    seconds = monotonic() - started
+                    result = build_response(response, await response.read())
+            except (ClientConnectionError, AsyncTimeoutError) as exception:
+                if self.adaptive is not None and isinstance(exception, AsyncTimeoutError):
+                    self.adaptive.on_timeout()
+                if self.retry is None or not self.retry.should_retry(retry, method, idempotent, exception=exception, connect_error=is_connect_error):
+                    raise
+                delay = self.retry.delay(retry)
+            else:
+                if self.adaptive is not None:
+                    self.adaptive.on_response(result.status_code, seconds)
+                if self.retry is None or not self.retry.should_retry(retry, method, idempotent, response=result):
+                    return result
+                delay = self.retry.delay(retry, result.headers.get('Retry-After'))
+
+            retry += 1
+            await sleep(self.limiter.defer(delay))
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+class AsyncCrawler:
+    """
+    drives the flows of a blocking crawler on an event loop, the rate limiter is shared with the blocking session.
+
+    >>> async with AsyncCrawler(CHDBits(headers=headers, qps=3)) as crawler:
+    ...     torrents = await crawler.get_torrents(pages=3)
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        self.crawler = crawler
+        self.session = AsyncSession(
+            limiter=crawler.session.limiter,
+            timeout=crawler.timeout,
+            headers=crawler.headers,
+            proxy=crawler.proxy,
+            retry=crawler.session.retry,
+            adaptive=crawler.session.adaptive
+        )
+
+    def __repr__(self) -> str:
+        return f'<AsyncCrawler {self.crawler.__class__.__name__} {self.crawler.base_url} proxy: {self.crawler.proxy}, qps: {self.crawler.qps}>'
+
+    async def __aenter__(self) -> AsyncCrawler:
+        return self
+
+    async def __aexit__(self, exception_type: Optional[Type[BaseException]], exception: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def run(self, flow: Flow[T]) -> T:
+        try:
+            request = next(flow)
+            while True:
+                request = flow.send(await self.session.request(request.method, request.url, **request.kwargs))
+        except StopIteration as stop:
+            return stop.value
+
+    async def get_user(self) -> User:
+        return await self.run(self.crawler.cached_user_flow(ttl=0))
+
+    async def iterate_pages(self, page_flow: PageFlow, pages: int, concurrency: int = 1) -> AsyncIterator[List[Torrent]]:
+        futures: Deque[Future[Optional[List[Torrent]]]] = deque()
+        next_page = 0
+        try:
+            while futures or next_page < pages:
+                while next_page < pages and len(futures) < concurrency:
+                    futures.append(ensure_future(self.run(page_flow(next_page))))
+                    next_page += 1
+
+                torrents = await futures.popleft()
+                if torrents is None:
+                    return
+                yield torrents
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @overload
+    def iter_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[False] = ..., **kwargs: Any) -> AsyncIterator[Torrent]: ...
+
+    @overload
+    def iter_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[True], **kwargs: Any) -> AsyncIterator[TorrentBatch]: ...
+
+    async def iter_torrents(self, pages: int = 1, concurrency: int = 1, *, batch: bool = False, **kwargs: Any) -> AsyncIterator[Union[Torrent, TorrentBatch]]:
+        async for torrents in self.iterate_pages(partial(self.crawler.torrents_page_flow, **kwargs), pages, concurrency):
+            if batch:
+                yield TorrentBatch(self.crawler, torrents)
+                continue
+
+            for torrent in torrents:
+                yield torrent
+
+    @overload
+    async def get_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[False] = ..., **kwargs: Any) -> List[Torrent]: ...
+
+    @overload
+    async def get_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[True], **kwargs: Any) -> TorrentBatch: ...
+
+    async def get_torrents(self, pages: int = 1, concurrency: int = 1, *, batch: bool = False, **kwargs: Any) -> Union[List[Torrent], TorrentBatch]:
+        if batch:
+            result = TorrentBatch(self.crawler)
+            async for torrents in self.iterate_pages(partial(self.crawler.torrents_page_flow, **kwargs), pages, concurrency):
+                result.extend(torrents)
+            return result
+
+        return [torrent async for torrent in self.iter_torrents(pages, concurrency, **kwargs)]
+
+    async def get_new_torrents(self, since_torrent_id: str, pages: int = 5, concurrency: int = 1, **kwargs: Any) -> List[Torrent]:
+        watermark = int(since_torrent_id)
+        new_torrents: List[Torrent] = []
+        async for torrents in self.iterate_pages(partial(self.crawler.torrents_page_flow, **kwargs), pages, concurrency):
+            new_torrents.extend(torrent for torrent in torrents if int(torrent.torrent_id) > watermark)
+            if not torrents or int(torrents[-1].torrent_id) <= watermark:
+                break
+        return new_torrents
+
+    async def get_torrent(self, torrent_id: str) -> Torrent:
+        return await self.run(self.crawler.torrent_flow(torrent_id))
+
+    async def iter_torrent_chunks(self, torrent_id: str) -> AsyncIterator[bytes]:
+        request = await self.run(self.crawler.download_request_flow(torrent_id))
+        if request is None:
+            raise CannotGetTorrentInformationException()
+
+        async with self.session.stream(request.method, request.url, **request.kwargs) as response:
+            if not response.status == HTTPStatus.OK:
+                raise RequestException(build_response(response, b''))
+
+            if (response.content_length or 0) > self.crawler.max_torrent_size:
+                raise TorrentTooLargeException(self.crawler.max_torrent_size)
+
+            size = 0
+            async for chunk in response.content.iter_chunked(self.crawler.chunk_size):
+                size += len(chunk)
+                if size > self.crawler.max_torrent_size:
+                    raise TorrentTooLargeException(self.crawler.max_torrent_size)
+                yield chunk
+
+    async def download_torrent(self, torrent_id: str, file_path: str) -> bool:
+        try:
+            with AtomicFile(file_path) as file:
+                async for chunk in self.iter_torrent_chunks(torrent_id):
+                    file.write(chunk)
+        except (CannotGetTorrentInformationException, RequestException, TorrentTooLargeException) as exception:
+            self.crawler.logger.warning(exception)
+            return False
+        return True
+
+    async def fetch_torrent_bytes(self, torrent_id: str) -> Optional[bytes]:
+        try:
+            return b''.join([chunk async for chunk in self.iter_torrent_chunks(torrent_id)])
+        except (CannotGetTorrentInformationException, RequestException, TorrentTooLargeException) as exception:
+            self.crawler.logger.warning(exception)
+            return None
+
+    async def download_torrents(self, torrent_ids: Iterable[str], directory: str, concurrency: int = 1) -> Dict[str, DownloadResult]:
+        makedirs(directory, exist_ok=True)
+        file_paths, known_results = plan_downloads(torrent_ids, directory)
+        pending_torrent_ids = [torrent_id for torrent_id in file_paths if torrent_id not in known_results]
+        semaphore = Semaphore(max(concurrency, 1))
+
+        async def download(torrent_id: str) -> DownloadResult:
+            file_path = file_paths[torrent_id]
+            try:
+                async with semaphore:
+                    downloaded = await self.download_torrent(torrent_id, file_path)
+            except Exception as exception: # pylint: disable=broad-exception-caught
+                self.crawler.logger.warning(exception)
+                return DownloadResult(torrent_id=torrent_id, file_path=file_path, status=DownloadStatus.FAILED, error=str(exception))
+
+            status = DownloadStatus.DOWNLOADED if downloaded else DownloadStatus.FAILED
+            return DownloadResult(torrent_id=torrent_id, file_path=file_path, status=status)
+
+        results = {**known_results, **dict(zip(pending_torrent_ids, await gather(*map(download, pending_torrent_ids))))}
+        return {torrent_id: results[torrent_id] for torrent_id in file_paths}
+
+    async def get_tasks(self, *args: Any, **kwargs: Any) -> List[Task]:
+        return await self.run(self.crawler.tasks_flow(*args, **kwargs))
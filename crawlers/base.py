@@ -1,8 +1,27 @@
 from __future__ import annotations
 
 from typing import Optional
+from typing import Union
 from typing import List
 from typing import Dict
+from typing import Any
+from typing import TypeVar
+from typing import Generator
+from typing import Callable
+from typing import Iterator
+from typing import Deque
+from typing import Tuple
+from typing import Iterable
+from typing import BinaryIO
+from typing import Type
+from typing import Sequence
+from typing import Literal
+from typing import overload
+from array import array
+from collections import deque
+from functools import partial
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
 from logging import getLogger
 from abc import ABC
@@ -11,12 +30,64 @@ from enum import Enum
 from urllib.parse import urlparse
 from urllib.parse import parse_qs
 from re import match
+from re import Pattern
+from re import IGNORECASE
+from re import compile as compile_pattern
+from time import monotonic
+from threading import local
+from http import HTTPStatus
+from types import TracebackType
+from secrets import token_hex
+from os import fsync
+from os import close
+from os import open as open_descriptor
+from os import O_RDONLY
+from os import remove
+from os import replace
+from os import makedirs
+from os.path import join
+from os.path import exists
+from os.path import dirname
+from os.path import abspath
 
 from pydantic import BaseModel
 from pydantic import Field
 from lxml import etree
+from requests import Response
 
 from .session import Session
+from .session import Cassette
+from .session import RetryPolicy
+from .session import TokenBucket
+from .session import AdaptiveRate
+from .session import FileTokenBucket
+from .exceptions import RequestException
+from .exceptions import CannotGetTorrentInformationException
+from .exceptions import TorrentTooLargeException
+
+try:
+    from os import O_DIRECTORY # pylint: disable=ungrouped-imports
+except ImportError: # pragma: no cover
+    O_DIRECTORY = None # type: ignore
+
+T = TypeVar('T')
+M = TypeVar('M', bound=BaseModel)
+
+class Request:
+    """
+    a request description yielded by a crawler flow, the keyword arguments are the ones of `requests.Session.request`.
+    """
+
+    def __init__(self, method: str, url: str, **kwargs: Any) -> None:
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+    def __repr__(self) -> str:
+        return f'<Request {self.method} {self.url}>'
+
+Flow = Generator[Request, Response, T]
+PageFlow = Callable[[int], Flow[Optional[List['Torrent']]]]
 
 def format_size(size: int) -> str:
     units = ['KB', 'MB', 'GB', 'TB', 'PB']
@@ -67,10 +138,138 @@ def calculate_bytes(number: str, unit: str) -> int:
 
     return int(float(number) * units.get(unit.lower(), 1))
 
-def find_element(html: etree._Element, xpath: str) -> Optional[etree._Element]: # pylint: disable=c-extension-no-member
-    elements = html.xpath(xpath)
+def construct(model: Type[M], fields: Dict[str, Any]) -> M:
+    """
+    fills a model with fields which are known to be valid and complete. `model_construct` of pydantic also resolves
+    defaults and aliases, which makes it slower than the validation itself, so the instance is filled directly.
+    """
+
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', fields)
+    object.__setattr__(instance, '__pydantic_fields_set__', set(fields))
+    object.__setattr__(instance, '__pydantic_extra__', None)
+    object.__setattr__(instance, '__pydantic_private__', None)
+    return instance
+
+html_parsers = local()
+
+def get_html_parser(encoding: str) -> etree.HTMLParser: # pylint: disable=c-extension-no-member
+    parsers = vars(html_parsers).setdefault('parsers', {})
+    if encoding not in parsers:
+        parsers[encoding] = etree.HTMLParser(encoding=encoding) # pylint: disable=c-extension-no-member
+    return parsers[encoding]
+
+def parse_html(content: bytes, encoding: str = 'utf8') -> Optional[etree._Element]: # pylint: disable=c-extension-no-member
+    """
+    parses the raw response body with a reused parser of the given encoding, so neither the charset detection of
+    `requests` nor a decoded copy of the page is needed. lxml parsers must not be shared between threads, so the
+    parsers are kept per thread.
+    """
+
+    return etree.HTML(content, get_html_parser(encoding)) # pylint: disable=c-extension-no-member
+
+def find_element(html: etree._Element, xpath: Union[str, etree.XPath]) -> Optional[etree._Element]: # pylint: disable=c-extension-no-member
+    elements = xpath(html) if isinstance(xpath, etree.XPath) else html.xpath(xpath) # pylint: disable=c-extension-no-member
     return elements[0] if elements else None
 
+def fsync_directory(directory: str) -> None:
+    if O_DIRECTORY is None: # pragma: no cover
+        return
+
+    descriptor = open_descriptor(directory, O_RDONLY | O_DIRECTORY)
+    try:
+        fsync(descriptor)
+    finally:
+        close(descriptor)
+
+class AtomicFile:
+    """
+    writes into a temporary file next to `file_path`, which is fsync'd and renamed into place when the block succeeds
+    and removed when it or the rename fails, so readers never see a partial file. the directory is fsync'd after the
+    rename, so the rename itself survives a crash.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.temporary_path = f'{file_path}.{token_hex(4)}.part'
+        self.file: Optional[BinaryIO] = None
+
+    def __enter__(self) -> AtomicFile:
+        self.file = open(self.temporary_path, 'xb') # pylint: disable=consider-using-with
+        return self
+
+    def __exit__(self, exception_type: Optional[Type[BaseException]], exception: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+        assert self.file is not None
+        committed = False
+        try:
+            try:
+                if exception is None:
+                    self.file.flush()
+                    fsync(self.file.fileno())
+            finally:
+                self.file.close()
+
+            if exception is None:
+                replace(self.temporary_path, self.file_path)
+                committed = True
+        finally:
+            if not committed and exists(self.temporary_path):
+                remove(self.temporary_path)
+
+        if committed:
+            fsync_directory(dirname(abspath(self.file_path)))
+
+    def write(self, chunk: bytes) -> None:
+        assert self.file is not None
+        self.file.write(chunk)
+
+def limit_size(chunks: Iterable[bytes], max_size: float, expected_size: int = 0) -> Iterator[bytes]:
+    if expected_size > max_size:
+        raise TorrentTooLargeException(max_size)
+
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size > max_size:
+            raise TorrentTooLargeException(max_size)
+        yield chunk
+
+table_tag_pattern = compile_pattern(rb'<(/?)table[\s>]', IGNORECASE)
+
+def cut_table(chunks: Iterable[bytes], start: Pattern[bytes]) -> Tuple[bytes, bool]:
+    """
+    reads `chunks` until the table whose start tag matches `start` is closed, and returns the bytes of that table
+    and `True`. the bytes before the table are dropped as soon as the table is found, and the chunks after the
+    table are never read, so the caller can close the response early. if no table matches, returns every byte
+    that has been read and `False`.
+    """
+
+    content = bytearray()
+    found = False
+    depth = 0
+    position = 0
+
+    for chunk in chunks:
+        content += chunk
+
+        if not found:
+            result = start.search(content, max(position - 4096, 0))
+            position = len(content)
+            if not result:
+                continue
+            del content[:result.start()]
+            found = True
+            position = 0
+
+        for result in table_tag_pattern.finditer(content, position):
+            depth += -1 if result.group(1) else 1
+            position = result.end()
+            if depth == 0:
+                return bytes(content[:result.start()]) + b'</table>', True
+        position = max(position, len(content) - 8)
+
+    return bytes(content), False
+
 class Status(str, Enum):
     LEECHING = 'leeching'
     SEEDING = 'seeding'
@@ -89,10 +288,64 @@ class User(BaseModel):
     bonus: float
     passkey: Optional[str] = Field(default=None)
 
+class DownloadStatus(str, Enum):
+    DOWNLOADED = 'downloaded'
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+
+class DownloadResult(BaseModel):
+    torrent_id: str
+    file_path: str
+    status: DownloadStatus
+    error: Optional[str] = Field(default=None)
+
+torrent_id_pattern = compile_pattern(r'[A-Za-z0-9_-]+')
+
+def plan_downloads(torrent_ids: Iterable[str], directory: str) -> Tuple[Dict[str, str], Dict[str, DownloadResult]]:
+    """
+    maps every distinct torrent id to `directory/<torrent_id>.torrent`, and returns the results known before any
+    download: ids that could escape `directory`, since they are scraped from the sites, fail and existing files are
+    skipped. the ids without a result are the ones to download.
+    """
+
+    file_paths: Dict[str, str] = {}
+    results: Dict[str, DownloadResult] = {}
+    for torrent_id in torrent_ids:
+        if torrent_id in file_paths:
+            continue
+
+        if not torrent_id_pattern.fullmatch(torrent_id):
+            file_paths[torrent_id] = ''
+            results[torrent_id] = DownloadResult(torrent_id=torrent_id, file_path='', status=DownloadStatus.FAILED, error='invalid torrent id')
+            continue
+
+        file_paths[torrent_id] = join(directory, f'{torrent_id}.torrent')
+        if exists(file_paths[torrent_id]):
+            results[torrent_id] = DownloadResult(torrent_id=torrent_id, file_path=file_paths[torrent_id], status=DownloadStatus.SKIPPED)
+    return file_paths, results
+
 class Promotion(BaseModel):
     upload_ratio: float
     download_ratio: float
 
+    class Config:
+        frozen = True
+
+    @classmethod
+    def intern(cls, upload_ratio: float, download_ratio: float) -> Promotion:
+        """
+        returns the shared promotion of the ratios. there are only a few distinct promotions across all sites, so the
+        parsers return the same immutable object for each of them, and promotions can be compared by identity.
+        """
+
+        key = (float(upload_ratio), float(download_ratio))
+        promotion = promotions.get(key)
+        if promotion is None:
+            promotion = promotions.setdefault(key, cls(upload_ratio=upload_ratio, download_ratio=download_ratio))
+        return promotion
+
+promotions: Dict[Tuple[float, float], Promotion] = {}
+
 class Torrent(BaseModel):
     torrent_id: str
     torrent_name: str
@@ -109,12 +362,95 @@ class Torrent(BaseModel):
     def save(self, file_path: str) -> None:
         self.crawler.download_torrent(self.torrent_id, file_path)
 
+    def fetch(self) -> Optional[bytes]:
+        return self.crawler.fetch_torrent_bytes(self.torrent_id)
+
     def __repr__(self) -> str:
         return f'<Torrent {self.crawler.__class__.__name__} {self.torrent_id} {self.torrent_name} up/down ' \
             f'{self.seeders}/{self.leechers} promotion {self.promotion.upload_ratio}/{self.promotion.download_ratio} {format_size(self.size)}>'
 
+class TorrentBatch(Sequence[Torrent]):
+    """
+    a compact, column oriented list of the torrents of one crawler. the numeric fields are kept in arrays and the
+    crawler is referenced once, a `Torrent` is only built when a row is accessed.
+    """
+
+    __slots__ = (
+        'crawler', 'torrent_ids', 'torrent_names', 'sizes', 'seeders', 'leechers', 'hit_and_runs', 'upload_ratios', 'download_ratios'
+    )
+
+    def __init__(self, crawler: Crawler, torrents: Iterable[Torrent] = ()) -> None:
+        self.crawler = crawler
+        self.torrent_ids: List[str] = []
+        self.torrent_names: List[str] = []
+        self.sizes = array('q')
+        self.seeders = array('q')
+        self.leechers = array('q')
+        self.hit_and_runs = array('q')
+        self.upload_ratios = array('d')
+        self.download_ratios = array('d')
+        self.extend(torrents)
+
+    def append(self, torrent: Torrent) -> None:
+        if torrent.crawler is not self.crawler:
+            raise ValueError(f'{torrent} does not belong to {self.crawler}')
+
+        self.torrent_ids.append(torrent.torrent_id)
+        self.torrent_names.append(torrent.torrent_name)
+        self.sizes.append(torrent.size)
+        self.seeders.append(torrent.seeders)
+        self.leechers.append(torrent.leechers)
+        self.hit_and_runs.append(torrent.hit_and_run)
+        self.upload_ratios.append(torrent.promotion.upload_ratio)
+        self.download_ratios.append(torrent.promotion.download_ratio)
+
+    def extend(self, torrents: Iterable[Torrent]) -> None:
+        for torrent in torrents:
+            self.append(torrent)
+
+    def __len__(self) -> int:
+        return len(self.torrent_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Torrent: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> TorrentBatch: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Torrent, TorrentBatch]:
+        if isinstance(index, slice):
+            batch = TorrentBatch(self.crawler)
+            for name in self.__slots__[1:]:
+                setattr(batch, name, getattr(self, name)[index])
+            return batch
+
+        return construct(
+            Torrent,
+            {
+                'torrent_id': self.torrent_ids[index],
+                'torrent_name': self.torrent_names[index],
+                'size': self.sizes[index],
+                'seeders': self.seeders[index],
+                'leechers': self.leechers[index],
+                'hit_and_run': self.hit_and_runs[index],
+                'promotion': Promotion.intern(upload_ratio=self.upload_ratios[index], download_ratio=self.download_ratios[index]),
+                'crawler': self.crawler
+            }
+        )
+
+    def __iter__(self) -> Iterator[Torrent]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f'<TorrentBatch {self.crawler.__class__.__name__} {len(self)} torrents>'
+
 class Crawler(ABC):
     base_url = ''
+    chunk_size = 64 * 1024
+    encoding = 'utf8'
+    number_pattern = r'\d+([\,]\d+)*([\.]\d+)'
+    unit_pattern = r'KB|MB|GB|TB|PB|KiB|MiB|GiB|TiB|PiB'
 
     def __init__(
         self,
@@ -123,7 +459,17 @@ class Crawler(ABC):
         proxy: Optional[str] = None,
         logger: Optional[Logger] = None,
         qps: float = 1,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        *,
+        burst: int = 1,
+        shared_qps: bool = False,
+        user_ttl: float = 600,
+        max_torrent_size: float = 32 * 1024 ** 2,
+        trusted: bool = False,
+        cassette: Optional[Cassette] = None,
+        retry: Optional[RetryPolicy] = None,
+        adaptive: bool = False,
+        max_qps: Optional[float] = None
     ) -> None:
         self.base_url = base_url or self.base_url
         self.headers = headers
@@ -131,36 +477,231 @@ class Crawler(ABC):
         self.proxies = {'http': proxy, 'https': proxy} if proxy else {}
         self.logger = logger or getLogger('dummy')
         self.qps = qps
+        self.burst = burst
         self.timeout = timeout
-
-        self.session = Session(qps=qps)
+        self.shared_qps = shared_qps
+        self.user_ttl = user_ttl
+        self.max_torrent_size = max_torrent_size
+        self.trusted = trusted
+        self.user_cache: Optional[Tuple[float, User]] = None
+
+        limiter = FileTokenBucket(key=self.base_url, qps=qps, burst=burst) if shared_qps else TokenBucket(qps=qps, burst=burst)
+        rate = AdaptiveRate(limiter, key=self.base_url, max_qps=max_qps) if adaptive else None
+        self.session = Session(limiter=limiter, cassette=cassette, retry=retry, adaptive=rate)
         self.session.proxies.update(self.proxies)
         self.session.headers.update(self.headers)
 
-        self.number_pattern = r'\d+([\,]\d+)*([\.]\d+)'
-        self.unit_pattern = r'KB|MB|GB|TB|PB|KiB|MiB|GiB|TiB|PiB'
-
     def __repr__(self) -> str:
         return f'<Crawler {self.__class__.__name__} {self.base_url} proxy: {self.proxy}, qps: {self.qps}>'
 
-    @abstractmethod
+    def build(self, model: Type[M], **fields: Any) -> M:
+        """
+        builds a model from the output of a parser. if the crawler is `trusted`, the parser has already checked the
+        values, so the model is constructed without the validation of pydantic.
+        """
+
+        return construct(model, fields) if self.trusted else model(**fields)
+
+    def run(self, flow: Flow[T]) -> T:
+        try:
+            request = next(flow)
+            while True:
+                request = flow.send(self.session.request(request.method, request.url, **request.kwargs))
+        except StopIteration as stop:
+            return stop.value
+
+    def cached_user_flow(self, ttl: Optional[float] = None) -> Flow[User]:
+        """
+        returns the cached user if it is younger than `ttl` seconds, which defaults to `user_ttl`, otherwise
+        fetches the user and refreshes the cache. flows that only need the user id or passkey should use this.
+        """
+
+        ttl = self.user_ttl if ttl is None else ttl
+        user_cache = self.user_cache
+        if user_cache is not None and monotonic() - user_cache[0] < ttl:
+            return user_cache[1]
+
+        user = yield from self.user_flow()
+        self.user_cache = (monotonic(), user)
+        return user
+
+    def invalidate_user(self) -> None:
+        self.user_cache = None
+
     def get_user(self) -> User:
+        return self.run(self.cached_user_flow(ttl=0))
+
+    def iterate_pages(self, page_flow: PageFlow, pages: int, concurrency: int = 1) -> Iterator[List[Torrent]]:
+        """
+        yields the torrents of each page in page order, keeping up to `concurrency` pages in flight.
+        a page flow returning `None` marks the end of the list.
+        """
+
+        if concurrency <= 1:
+            for page in range(pages):
+                torrents = self.run(page_flow(page))
+                if torrents is None:
+                    return
+                yield torrents
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures: Deque[Future[Optional[List[Torrent]]]] = deque()
+            next_page = 0
+            try:
+                while futures or next_page < pages:
+                    while next_page < pages and len(futures) < concurrency:
+                        futures.append(executor.submit(self.run, page_flow(next_page)))
+                        next_page += 1
+
+                    torrents = futures.popleft().result()
+                    if torrents is None:
+                        return
+                    yield torrents
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @overload
+    def iter_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[False] = ..., **kwargs: Any) -> Iterator[Torrent]: ...
+
+    @overload
+    def iter_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[True], **kwargs: Any) -> Iterator[TorrentBatch]: ...
+
+    def iter_torrents(self, pages: int = 1, concurrency: int = 1, *, batch: bool = False, **kwargs: Any) -> Iterator[Union[Torrent, TorrentBatch]]:
+        """
+        yields the torrents one by one, or a `TorrentBatch` for each page if `batch` is set.
+        """
+
+        for torrents in self.iterate_pages(partial(self.torrents_page_flow, **kwargs), pages, concurrency):
+            if batch:
+                yield TorrentBatch(self, torrents)
+            else:
+                yield from torrents
+
+    @overload
+    def get_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[False] = ..., **kwargs: Any) -> List[Torrent]: ...
+
+    @overload
+    def get_torrents(self, pages: int = ..., concurrency: int = ..., *, batch: Literal[True], **kwargs: Any) -> TorrentBatch: ...
+
+    def get_torrents(self, pages: int = 1, concurrency: int = 1, *, batch: bool = False, **kwargs: Any) -> Union[List[Torrent], TorrentBatch]:
+        """
+        returns the torrents as a list, or as a single `TorrentBatch` if `batch` is set.
+        """
+
+        if batch:
+            result = TorrentBatch(self)
+            for torrents in self.iterate_pages(partial(self.torrents_page_flow, **kwargs), pages, concurrency):
+                result.extend(torrents)
+            return result
+
+        return list(self.iter_torrents(pages, concurrency, **kwargs))
+
+    def get_new_torrents(self, since_torrent_id: str, pages: int = 5, concurrency: int = 1, **kwargs: Any) -> List[Torrent]:
+        """
+        walks the list newest first and returns the torrents newer than `since_torrent_id`. the walk stops at the first
+        page whose last torrent is not newer, so pinned torrents on the top of a page do not end it early.
+        """
+
+        watermark = int(since_torrent_id)
+        new_torrents: List[Torrent] = []
+        for torrents in self.iterate_pages(partial(self.torrents_page_flow, **kwargs), pages, concurrency):
+            new_torrents.extend(torrent for torrent in torrents if int(torrent.torrent_id) > watermark)
+            if not torrents or int(torrents[-1].torrent_id) <= watermark:
+                break
+        return new_torrents
+
+    def get_torrent(self, torrent_id: str) -> Torrent:
+        return self.run(self.torrent_flow(torrent_id))
+
+    def iter_torrent_chunks(self, torrent_id: str) -> Iterator[bytes]:
+        """
+        streams the raw bencoded payload of a torrent, raising if it cannot be located, the request fails or the
+        payload is larger than `max_torrent_size`.
+        """
+
+        request = self.run(self.download_request_flow(torrent_id))
+        if request is None:
+            raise CannotGetTorrentInformationException()
+
+        with self.session.request(request.method, request.url, stream=True, **request.kwargs) as response:
+            if not response.status_code == HTTPStatus.OK:
+                raise RequestException(response)
+
+            expected_size = int(response.headers.get('Content-Length', 0))
+            yield from limit_size(response.iter_content(chunk_size=self.chunk_size), self.max_torrent_size, expected_size)
+
+    def download_torrent(self, torrent_id: str, file_path: str) -> bool:
+        try:
+            with AtomicFile(file_path) as file:
+                for chunk in self.iter_torrent_chunks(torrent_id):
+                    file.write(chunk)
+        except (CannotGetTorrentInformationException, RequestException, TorrentTooLargeException) as exception:
+            self.logger.warning(exception)
+            return False
+        return True
+
+    def fetch_torrent_bytes(self, torrent_id: str) -> Optional[bytes]:
+        try:
+            return b''.join(self.iter_torrent_chunks(torrent_id))
+        except (CannotGetTorrentInformationException, RequestException, TorrentTooLargeException) as exception:
+            self.logger.warning(exception)
+            return None
+
+    def download_torrents(self, torrent_ids: Iterable[str], directory: str, concurrency: int = 1) -> Dict[str, DownloadResult]:
+        """
+        downloads every torrent into `directory/<torrent_id>.torrent`, duplicated ids are dropped, existing files
+        are skipped and ids other than letters, digits, `_` and `-` fail. the result of each torrent id is returned
+        in the order the ids were given.
+        """
+
+        makedirs(directory, exist_ok=True)
+        file_paths, known_results = plan_downloads(torrent_ids, directory)
+        pending_torrent_ids = [torrent_id for torrent_id in file_paths if torrent_id not in known_results]
+
+        def download(torrent_id: str) -> DownloadResult:
+            file_path = file_paths[torrent_id]
+            try:
+                downloaded = self.download_torrent(torrent_id, file_path)
+            except Exception as exception: # pylint: disable=broad-exception-caught
+                self.logger.warning(exception)
+                return DownloadResult(torrent_id=torrent_id, file_path=file_path, status=DownloadStatus.FAILED, error=str(exception))
+
+            status = DownloadStatus.DOWNLOADED if downloaded else DownloadStatus.FAILED
+            return DownloadResult(torrent_id=torrent_id, file_path=file_path, status=status)
+
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            results = {**known_results, **dict(zip(pending_torrent_ids, executor.map(download, pending_torrent_ids)))}
+
+        return {torrent_id: results[torrent_id] for torrent_id in file_paths}
+
+    def get_tasks(self) -> List[Task]:
+        return self.run(self.tasks_flow())
+
+    @abstractmethod
+    def user_flow(self) -> Flow[User]:
         return NotImplemented
 
     @abstractmethod
-    def get_torrents(self, pages: int = 1) -> List[Torrent]:
+    def torrents_page_flow(self, page: int) -> Flow[Optional[List[Torrent]]]:
         return NotImplemented
 
     @abstractmethod
-    def get_torrent(self, torrent_id: str) -> Torrent:
+    def torrent_flow(self, torrent_id: str) -> Flow[Torrent]:
         return NotImplemented
 
     @abstractmethod
-    def download_torrent(self, torrent_id: str, file_path: str) -> bool:
+    def download_request_flow(self, torrent_id: str) -> Flow[Optional[Request]]:
+        """
+        sends whatever requests are needed to locate the torrent file and returns the request that fetches it,
+        or `None` if it cannot be located.
+        """
+
         return NotImplemented
 
     @abstractmethod
-    def get_tasks(self) -> List[Task]:
+    def tasks_flow(self) -> Flow[List[Task]]:
         return NotImplemented
 
 Torrent.update_forward_refs()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from requests import Response
 
 class CannotGetUserInformationException(Exception):
@@ -11,3 +13,11 @@ class RequestException(Exception):
 class CannotGetTorrentInformationException(Exception):
     def __init__(self) -> None:
         super().__init__('cannot get torrent information')
+
+class TorrentTooLargeException(Exception):
+    def __init__(self, max_size: float) -> None:
+        super().__init__(f'torrent is larger than {max_size} bytes')
+
+class RecordingNotFoundException(Exception):
+    def __init__(self, method: Optional[str], url: Optional[str]) -> None:
+        super().__init__(f'no recorded response for {method} {url}')
@@ -1,12 +1,16 @@
 from typing import List
+from typing import Dict
+from typing import Any
+from typing import Optional
+from json import loads
 from http import HTTPStatus
 
 from pydantic import BaseModel
 from pydantic import Field
-from pydantic import validator
-from pydantic import ValidationError
 
 from .base import Crawler
+from .base import Request
+from .base import Flow
 from .base import Torrent
 from .base import Status
 from .base import User
@@ -14,14 +18,7 @@ from .base import Task
 from .base import convert_to_bytes
 from .base import Promotion
 from .exceptions import RequestException
-
-class Peers(BaseModel):
-    upload: int
-    download: int
-
-class TorrentStatus(BaseModel):
-    download_ratio: float = Field(alias='downCoefficient')
-    upload_ratio: float = Field(alias='upCoefficient')
+from .exceptions import CannotGetTorrentInformationException
 
 class TaskItem(BaseModel):
     torrent_id: str = Field(alias='tid')
@@ -34,30 +31,6 @@ class TaskData(BaseModel):
 class ListTaskResponse(BaseModel):
     data: TaskData
 
-class TorrentItem(BaseModel):
-    torrent_id: str = Field(alias='tid')
-    torrent_name: str = Field(alias='title')
-    size: str = Field(alias='fileSize')
-    peers: Peers
-    promotion: TorrentStatus = Field(alias='status')
-
-    @validator('size')
-    def size_validator(cls, value: str) -> int:
-        result = convert_to_bytes(value)
-        if not result:
-            raise ValueError(f'Invalid size {value}')
-        return result
-
-    @validator('promotion')
-    def promotion_validator(cls, value: TorrentStatus) -> Promotion:
-        return Promotion(upload_ratio=value.upload_ratio, download_ratio=value.download_ratio)
-
-class TorrentList(BaseModel):
-    items: List[TorrentItem] = Field(alias='list')
-
-class ListTorrentsResponse(BaseModel):
-    data: TorrentList
-
 class UserData(BaseModel):
     upload_bytes: int = Field(alias='upload')
     download_bytes: int = Field(alias='download')
@@ -69,56 +42,61 @@ class UserData(BaseModel):
 class GetUserResponse(BaseModel):
     data: UserData
 
-class GetTorrentData(BaseModel):
-    torrent: TorrentItem
-
-class GetTorrentResponse(BaseModel):
-    data: GetTorrentData
-
 class FSM(Crawler):
     base_url: str = 'https://api.fsm.name'
 
-    def get_torrents(self, pages: int = 1) -> List[Torrent]:
-        torrents = []
+    def decode_torrent(self, item: Dict[str, Any]) -> Torrent:
+        """
+        builds a torrent from an item of the decoded json, raises `KeyError`, `TypeError` or `ValueError` if the item
+        is broken.
+        """
+
+        size = convert_to_bytes(item['fileSize'])
+        if not size:
+            raise ValueError(f'Invalid size {item["fileSize"]}')
+
+        peers, status = item['peers'], item['status']
+        return self.build(
+            Torrent,
+            torrent_id=str(item['tid']),
+            torrent_name=item['title'],
+            size=size,
+            hit_and_run=0,
+            promotion=Promotion.intern(upload_ratio=status['upCoefficient'], download_ratio=status['downCoefficient']),
+            seeders=int(peers['upload']),
+            leechers=int(peers['download']),
+            crawler=self
+        )
+
+    def torrents_page_flow(self, page: int) -> Flow[List[Torrent]]:
+        response = yield Request(
+            'GET',
+            url=self.base_url + '/Torrents/listTorrents',
+            params={
+                'type': '0',
+                'systematics': '0',
+                'tags': '[]',
+                'keyword': '',
+                'page': str(page + 1)
+            }
+        )
+
+        if not response.status_code == HTTPStatus.OK:
+            raise RequestException(response)
 
-        for page in range(pages):
-            response = self.session.get(
-                url=self.base_url + '/Torrents/listTorrents',
-                params={
-                    'type': '0',
-                    'systematics': '0',
-                    'tags': '[]',
-                    'keyword': '',
-                    'page': str(page + 1)
-                }
-            )
-
-            if not response.status_code == HTTPStatus.OK:
-                raise RequestException(response)
-
-            list_torrents_response = ListTorrentsResponse.parse_obj(response.json())
-            for item in list_torrents_response.data.items:
-                try:
-                    torrent = Torrent(
-                        torrent_id=item.torrent_id,
-                        torrent_name=item.torrent_name,
-                        size=item.size,
-                        hit_and_run=False,
-                        promotion=item.promotion,
-                        seeders=item.peers.upload,
-                        leechers=item.peers.download,
-                        crawler=self
-                    )
-                except ValidationError as exception:
-                    self.logger.warning(exception)
-                    continue
-                else:
-                    torrents.append(torrent)
+        torrents = []
+        for item in loads(response.content)['data']['list']:
+            try:
+                torrent = self.decode_torrent(item)
+            except (KeyError, TypeError, ValueError) as exception:
+                self.logger.warning(exception)
+            else:
+                torrents.append(torrent)
 
         return torrents
 
-    def get_user(self) -> User:
-        response = self.session.get(self.base_url + '/Users/infos')
+    def user_flow(self) -> Flow[User]:
+        response = yield Request('GET', self.base_url + '/Users/infos')
         if not response.status_code == HTTPStatus.OK:
             raise RequestException(response)
 
@@ -134,8 +112,9 @@ class FSM(Crawler):
             passkey=get_user_response.data.passkey
         )
 
-    def get_torrent(self, torrent_id: str) -> Torrent:
-        response = self.session.get(
+    def torrent_flow(self, torrent_id: str) -> Flow[Torrent]:
+        response = yield Request(
+            'GET',
             url=self.base_url + '/Torrents/details',
             params={'tid': torrent_id}
         )
@@ -143,42 +122,26 @@ class FSM(Crawler):
         if not response.status_code == HTTPStatus.OK:
             raise RequestException(response)
 
-        get_torrent_response: GetTorrentResponse = GetTorrentResponse.parse_obj(response.json())
-        item = get_torrent_response.data.torrent
-
-        return Torrent(
-            torrent_id=item.torrent_id,
-            torrent_name=item.torrent_name,
-            size=item.size,
-            hit_and_run=False,
-            promotion=item.promotion,
-            seeders=item.peers.upload,
-            leechers=item.peers.download,
-            crawler=self
-        )
+        try:
+            return self.decode_torrent(loads(response.content)['data']['torrent'])
+        except (KeyError, TypeError, ValueError) as exception:
+            raise CannotGetTorrentInformationException() from exception
 
-    def download_torrent(self, torrent_id: str, file_path: str) -> bool:
-        user = self.get_user()
+    def download_request_flow(self, torrent_id: str) -> Flow[Optional[Request]]:
+        user = yield from self.cached_user_flow()
 
-        response = self.session.get(
+        return Request(
+            'GET',
             url=self.base_url + '/Torrents/download',
             params={'passkey': user.passkey, 'tid': torrent_id, 'source': 'direct'}
         )
 
-        if not response.status_code == HTTPStatus.OK:
-            self.logger.warning(RequestException(response))
-            return False
-
-        with open(file_path, 'wb') as file:
-            file.write(response.content)
-            return True
-
-    def get_tasks(self) -> List[Task]:
+    def tasks_flow(self) -> Flow[List[Task]]:
         page = 1
         tasks = []
         for api_path, status in [('/Torrents/listMyDownload', Status.LEECHING), ('/Torrents/listMySeed', Status.SEEDING)]:
             while True:
-                response = self.session.get(self.base_url + api_path, params={'page': str(page)})
+                response = yield Request('GET', self.base_url + api_path, params={'page': str(page)})
 
                 if not response.status_code == HTTPStatus.OK:
                     self.logger.warning(RequestException(response))
@@ -186,7 +149,7 @@ class FSM(Crawler):
                 list_tasks_response: ListTaskResponse = ListTaskResponse.parse_obj(response.json())
 
                 for item in list_tasks_response.data.items:
-                    tasks.append(Task(torrent_id=item.torrent_id, torrent_name=item.torrent_name, status=status))
+                    tasks.append(self.build(Task, torrent_id=item.torrent_id, torrent_name=item.torrent_name, status=status))
 
                 if page >= list_tasks_response.data.total_pages:
                     break
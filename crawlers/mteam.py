@@ -1,40 +1,30 @@
 from typing import List
+from typing import Dict
+from typing import Any
 from typing import Optional
+from json import loads
 from http import HTTPStatus
 
 from pydantic import BaseModel
 from pydantic import Field
-from pydantic import validator
-from pydantic import ValidationError
 
 from .base import Crawler
+from .base import Request
+from .base import Flow
 from .base import User
 from .base import Task
 from .base import Torrent
 from .base import Status
 from .base import Promotion
 from .exceptions import RequestException
+from .exceptions import CannotGetTorrentInformationException
 
-class SearchItemStatus(BaseModel):
-    seeders: int
-    leechers: int
-    promotion: Promotion = Field(alias='discount')
-
-    @validator('promotion', pre=True)
-    def promotion_validator(cls, value: str) -> Promotion:
-        if value == 'FREE':
-            return Promotion(upload_ratio=1, download_ratio=0)
-
-        if value == 'PERCENT_50':
-            return Promotion(upload_ratio=1, download_ratio=0.5)
-
-        if value == 'PERCENT_70':
-            return Promotion(upload_ratio=1, download_ratio=0.3)
-
-        if value == 'NORMAL':
-            return Promotion(upload_ratio=1, download_ratio=1)
-
-        return Promotion(upload_ratio=1, download_ratio=1)
+promotion_map = {
+    'FREE': Promotion.intern(upload_ratio=1, download_ratio=0),
+    'PERCENT_50': Promotion.intern(upload_ratio=1, download_ratio=0.5),
+    'PERCENT_70': Promotion.intern(upload_ratio=1, download_ratio=0.3),
+    'NORMAL': Promotion.intern(upload_ratio=1, download_ratio=1),
+}
 
 class TaskTorrent(BaseModel):
     id: str
@@ -53,20 +43,6 @@ class TaskResponse(BaseModel):
     message: str
     data: TaskData
 
-class SearchItem(BaseModel):
-    name: str
-    size: int
-    id: str
-    status: SearchItemStatus
-
-class SearchData(BaseModel):
-    items: List[SearchItem] = Field(alias='data')
-
-class SearchResponse(BaseModel):
-    code: str
-    message: str
-    search_data: Optional[SearchData] = Field(alias='data')
-
 class MemberCount(BaseModel):
     upload_bytes: int = Field(alias='uploaded')
     download_bytes: int = Field(alias='downloaded')
@@ -83,17 +59,6 @@ class ProfileResponse(BaseModel):
     message: str
     data: ProfileData
 
-class TorrentData(BaseModel):
-    id: str
-    name: str
-    size: int
-    status: SearchItemStatus
-
-class TorrentResponse(BaseModel):
-    code: str
-    message: str
-    data: TorrentData
-
 class DITokenResponse(BaseModel):
     code: str
     message: str
@@ -102,57 +67,73 @@ class DITokenResponse(BaseModel):
 class MTeam(Crawler):
     base_url: str = 'https://api.m-team.cc'
 
-    def get_torrents(self, pages: int = 1, mode: str = 'normal') -> List[Torrent]:
-        torrents = []
+    def get_tasks(self, page_size: int = 100) -> List[Task]:
+        return self.run(self.tasks_flow(page_size))
+
+    def decode_torrent(self, item: Dict[str, Any]) -> Torrent:
+        """
+        builds a torrent from an item of the decoded json, raises `KeyError`, `TypeError` or `ValueError` if the item
+        is broken.
+        """
+
+        status = item['status']
+        return self.build(
+            Torrent,
+            torrent_id=str(item['id']),
+            torrent_name=item['name'],
+            size=int(item['size']),
+            seeders=int(status['seeders']),
+            leechers=int(status['leechers']),
+            hit_and_run=0,
+            promotion=promotion_map.get(status['discount'], promotion_map['NORMAL']),
+            crawler=self,
+        )
 
-        for page in range(pages):
-            response = self.session.post(
-                url=self.base_url + '/api/torrent/search',
-                json={
-                    'mode': mode,
-                    'categories': [],
-                    'visible': 1,
-                    'pageNumber': page + 1,
-                    'pageSize': 100,
-                }
-            )
-
-            if not response.status_code == HTTPStatus.OK:
-                raise RequestException(response)
-
-            search_response: SearchResponse = SearchResponse.parse_raw(response.text)
-            if not search_response.search_data:
-                self.logger.warning(search_response.message)
-                break
-
-            for item in search_response.search_data.items:
-                try:
-                    torrent = Torrent(
-                        torrent_id=item.id,
-                        torrent_name=item.name,
-                        size=item.size,
-                        hit_and_run=False,
-                        promotion=item.status.promotion,
-                        seeders=item.status.seeders,
-                        leechers=item.status.leechers,
-                        crawler=self,
-                    )
-                except ValidationError as exception:
-                    self.logger.warning(exception)
-                else:
-                    torrents.append(torrent)
+    def torrents_page_flow(self, page: int, mode: str = 'normal') -> Flow[Optional[List[Torrent]]]:
+        response = yield Request(
+            'POST',
+            url=self.base_url + '/api/torrent/search',
+            json={
+                'mode': mode,
+                'categories': [],
+                'visible': 1,
+                'pageNumber': page + 1,
+                'pageSize': 100,
+            },
+            idempotent=True
+        )
+
+        if not response.status_code == HTTPStatus.OK:
+            raise RequestException(response)
+
+        search_response = loads(response.content)
+        search_data = search_response.get('data')
+        if not search_data:
+            self.logger.warning(search_response.get('message'))
+            return None
+
+        torrents = []
+        for item in search_data['data']:
+            try:
+                torrent = self.decode_torrent(item)
+            except (KeyError, TypeError, ValueError) as exception:
+                self.logger.warning(exception)
+            else:
+                torrents.append(torrent)
 
         return torrents
 
-    def get_user(self) -> User:
-        response = self.session.post(
+    def user_flow(self) -> Flow[User]:
+        response = yield Request(
+            'POST',
             url=self.base_url + '/api/member/profile',
+            idempotent=True
         )
 
         if not response.status_code == HTTPStatus.OK:
             raise RequestException(response)
 
-        profile_response: ProfileResponse = ProfileResponse.parse_raw(response.text)
+        profile_response: ProfileResponse = ProfileResponse.parse_raw(response.content)
         return User(
             user_id=profile_response.data.user_id,
             user_name=profile_response.data.user_name,
@@ -162,66 +143,54 @@ class MTeam(Crawler):
             bonus=profile_response.data.member_count.bonus,
         )
 
-    def get_torrent(self, torrent_id: str) -> Torrent:
-        response = self.session.post(self.base_url + '/api/torrent/detail', data={'id': torrent_id})
+    def torrent_flow(self, torrent_id: str) -> Flow[Torrent]:
+        response = yield Request('POST', self.base_url + '/api/torrent/detail', data={'id': torrent_id}, idempotent=True)
 
         if not response.status_code == HTTPStatus.OK:
             raise RequestException(response)
 
-        torrent_response: TorrentResponse = TorrentResponse.parse_raw(response.text)
-        return Torrent(
-            torrent_id=torrent_response.data.id,
-            torrent_name=torrent_response.data.name,
-            size=torrent_response.data.size,
-            hit_and_run=False,
-            promotion=torrent_response.data.status.promotion,
-            seeders=torrent_response.data.status.seeders,
-            leechers=torrent_response.data.status.leechers,
-            crawler=self
-        )
-
-    def download_torrent(self, torrent_id: str, file_path: str) -> bool:
-        response = self.session.post(self.base_url + '/api/torrent/genDlToken', data={'id': torrent_id})
+        try:
+            return self.decode_torrent(loads(response.content)['data'])
+        except (KeyError, TypeError, ValueError) as exception:
+            raise CannotGetTorrentInformationException() from exception
 
-        if not response.status_code == HTTPStatus.OK:
-            self.logger.warning(RequestException(response))
-            return False
-
-        di_token_response: DITokenResponse = DITokenResponse.parse_raw(response.text)
-        response = self.session.get(di_token_response.download_url)
+    def download_request_flow(self, torrent_id: str) -> Flow[Optional[Request]]:
+        response = yield Request('POST', self.base_url + '/api/torrent/genDlToken', data={'id': torrent_id})
 
         if not response.status_code == HTTPStatus.OK:
             self.logger.warning(RequestException(response))
-            return False
+            return None
 
-        with open(file_path, 'wb') as file:
-            file.write(response.content)
-            return True
+        di_token_response: DITokenResponse = DITokenResponse.parse_raw(response.content)
+        return Request('GET', di_token_response.download_url)
 
-    def get_tasks(self, page_size: int = 100) -> List[Task]:
+    def tasks_flow(self, page_size: int = 100) -> Flow[List[Task]]:
         tasks = []
-        user = self.get_user()
+        user = yield from self.cached_user_flow()
 
         for status in [Status.SEEDING, Status.LEECHING]:
             page_number = 1
 
             while True:
-                response = self.session.post(
+                response = yield Request(
+                    'POST',
                     url=self.base_url + '/api/member/getUserTorrentList',
                     json={
                         "userid": user.user_id,
                         "type": status.upper(),
                         "pageNumber": page_number,
                         "pageSize": page_size
-                    }
+                    },
+                    idempotent=True
                 )
 
                 if not response.status_code == HTTPStatus.OK:
                     raise RequestException(response)
 
-                task_response: TaskResponse = TaskResponse.parse_raw(response.text)
+                task_response: TaskResponse = TaskResponse.parse_raw(response.content)
                 for item in task_response.data.items:
-                    task = Task(
+                    task = self.build(
+                        Task,
                         torrent_id=item.torrent.id,
                         torrent_name=item.torrent.name,
                         status=status
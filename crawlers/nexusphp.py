@@ -0,0 +1,329 @@
+from re import Pattern
+from re import IGNORECASE
+from re import compile as compile_pattern
+from typing import Any
+from typing import List
+from typing import Dict
+from typing import Optional
+from http import HTTPStatus
+
+from lxml import etree # pylint: disable=c-extension-no-member
+
+from pydantic import ValidationError
+
+from .base import Crawler
+from .base import Request
+from .base import Flow
+from .base import User
+from .base import Torrent
+from .base import Task
+from .base import Promotion
+from .base import get_id_from_href
+from .base import find_element
+from .base import parse_html
+from .base import cut_table
+from .base import Status
+from .base import calculate_bytes
+from .base import convert_to_bytes
+from .exceptions import CannotGetUserInformationException
+from .exceptions import CannotGetTorrentInformationException
+from .exceptions import RequestException
+
+promotion_map = {
+    'pro_free': Promotion.intern(upload_ratio=1, download_ratio=0),
+    'pro_2up': Promotion.intern(upload_ratio=2, download_ratio=1),
+    'pro_free2up': Promotion.intern(upload_ratio=2, download_ratio=0),
+    'pro_50pctdown': Promotion.intern(upload_ratio=1, download_ratio=0.5),
+    'pro_50pctdown2up': Promotion.intern(upload_ratio=2, download_ratio=0.5),
+    'pro_30pctdown': Promotion.intern(upload_ratio=1, download_ratio=0.3),
+    'free': Promotion.intern(upload_ratio=1, download_ratio=0),
+    'twoup': Promotion.intern(upload_ratio=2, download_ratio=1),
+    'twoupfree': Promotion.intern(upload_ratio=2, download_ratio=0),
+    'halfdown': Promotion.intern(upload_ratio=1, download_ratio=0.5),
+    'twouphalfdown': Promotion.intern(upload_ratio=2, download_ratio=0.5),
+    'thirtypercent': Promotion.intern(upload_ratio=1, download_ratio=0.3),
+    'normal': Promotion.intern(upload_ratio=1, download_ratio=1),
+}
+
+def get_text(element: etree._Element) -> str: # pylint: disable=c-extension-no-member
+    return ' '.join(''.join(element.itertext()).split())
+
+class NexusPHP(Crawler):
+    """
+    the engine of the sites built on NexusPHP, a site only declares its spec as class attributes:
+
+    - `xpaths` maps the field names to xpath expressions, it is merged with the defaults of the base classes.
+    - `list_table` is an optional regular expression of the start tag of the torrent table, if it is set, the
+      torrents page is streamed, only the torrent table is parsed and the rest of the page is not downloaded, the
+      rows are selected by `list_table_rows` then. the whole page is parsed if the table can not be found.
+    - `patterns` maps the field names to regular expressions, `{number}` and `{unit}` are replaced with
+      `number_pattern` and `unit_pattern`. all of them run on the whitespace-collapsed text of the element.
+
+    both of them are compiled once when the site class is created, the flows only run the compiled objects.
+    """
+
+    xpaths: Dict[str, str] = {
+        'user_email': "//td[preceding-sibling::td[1][text()='邮箱地址']]",
+        'user_user_id': '//*[@id="info_block"]/tr/td/table/tr/td[1]/span/span[1]/a',
+        'user_title': '//*[@id="info_block"]/tr/td/table/tr/td[1]',
+        'user_passkey': "//td[preceding-sibling::td[1][text()='密钥']]",
+        'list_rows': '/html/body/table[2]/tr[2]/td/table/tr/td/table/tr',
+        'list_table_rows': '/html/body/table/tr',
+        'list_title': 'td[2]//a[1]',
+        'list_size': 'td[5]',
+        'list_seeders': 'td[6]',
+        'list_leechers': 'td[7]',
+        'list_promotion': './/img[starts-with(@class, "pro_")]',
+        'detail_title': '//*[@id="top"]',
+        'detail_size': "//td[preceding-sibling::td[1][text()='基本信息']]",
+        'detail_peers': "//td[preceding-sibling::td[1][text()='同伴']]",
+        'detail_promotion': './/font[@class="free" or @class="twoup" or @class="twoupfree" or @class="halfdown" or @class="twouphalfdown" or @class="thirtypercent"]',
+        'task_rows': '//tr',
+        'task_title': 'td[2]/a',
+    }
+    patterns: Dict[str, str] = {
+        'detail_size': r'大小：(?P<size>.+?) ?类型',
+        'detail_peers': r'(?P<seeders>[\d,]+) ?个做种者 ?\| ?(?P<leechers>[\d,]+) ?个下载者',
+    }
+
+    list_table: Optional[bytes] = None
+
+    hr_policy: Dict[str, int] = {}
+    default_hit_and_run: int = 0
+    list_header_rows: int = 1
+    detail_path: str = '/details.php'
+    detail_title_itertext: bool = False
+    user_passkey_attribute: Optional[str] = None
+
+    selectors: Dict[str, Any] = {}
+    regexes: Dict[str, Pattern] = {}
+    list_table_regex: Optional[Pattern] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        xpaths: Dict[str, str] = {}
+        patterns: Dict[str, str] = {}
+        for clazz in reversed(cls.__mro__):
+            xpaths.update(vars(clazz).get('xpaths', {}))
+            patterns.update(vars(clazz).get('patterns', {}))
+
+        cls.selectors = {name: etree.XPath(xpath) for name, xpath in xpaths.items()} # pylint: disable=c-extension-no-member
+        cls.regexes = {
+            name: compile_pattern(pattern.format(number=cls.number_pattern, unit=cls.unit_pattern))
+            for name, pattern in patterns.items()
+        }
+        cls.list_table_regex = compile_pattern(cls.list_table, IGNORECASE) if cls.list_table else None
+
+    def select(self, element: Optional[etree._Element], name: str) -> Optional[etree._Element]: # pylint: disable=c-extension-no-member
+        selector = self.selectors.get(name)
+        if element is None or selector is None:
+            return None
+        return find_element(element, selector)
+
+    def get_promotion(self, element: Optional[etree._Element]) -> Promotion: # pylint: disable=c-extension-no-member
+        clazz = element.get('class') if element is not None else None
+        return promotion_map.get(clazz or 'normal', promotion_map['normal'])
+
+    def get_hit_and_run(self, label: Optional[str]) -> int:
+        return self.hr_policy.get((label or '').strip(), self.default_hit_and_run)
+
+    def user_flow(self) -> Flow[User]:
+        response = yield Request('GET', url=self.base_url + '/usercp.php', timeout=self.timeout)
+        if not response.status_code == HTTPStatus.OK:
+            raise RequestException(response)
+
+        html = parse_html(response.content, self.encoding)
+
+        email_element = self.select(html, 'user_email')
+        user_id_element = self.select(html, 'user_user_id')
+        title_element = self.select(html, 'user_title')
+        passkey_element = self.select(html, 'user_passkey')
+
+        if email_element is None or user_id_element is None or title_element is None or passkey_element is None:
+            raise CannotGetUserInformationException()
+
+        result = self.regexes['user'].match(get_text(title_element))
+        if not result:
+            raise CannotGetUserInformationException()
+
+        user_id = get_id_from_href(user_id_element.get('href'))
+        if not user_id:
+            raise CannotGetUserInformationException()
+
+        if self.user_passkey_attribute:
+            passkey = passkey_element.get(self.user_passkey_attribute)
+        else:
+            passkey = ''.join(passkey_element.itertext()).strip()
+
+        return User(
+            user_id=user_id,
+            user_name=result.group('user_name'),
+            upload_bytes=calculate_bytes(result.group('upload_number'), result.group('upload_unit')),
+            download_bytes=calculate_bytes(result.group('download_number'), result.group('download_unit')),
+            email=email_element.text,
+            bonus=float(result.group('bonus').replace(',', '')),
+            passkey=passkey
+        )
+
+    def torrents_page_flow(self, page: int) -> Flow[List[Torrent]]:
+        response = yield Request(
+            'GET',
+            url=self.base_url + '/torrents.php',
+            params={'page': str(page), 'incldead': '0', 'spstate': '0'},
+            timeout=self.timeout,
+            stream=self.list_table_regex is not None
+        )
+
+        if not response.status_code == HTTPStatus.OK:
+            raise RequestException(response)
+
+        selector = self.selectors['list_rows']
+        if self.list_table_regex is None:
+            content = response.content
+        else:
+            with response:
+                content, found = cut_table(response.iter_content(self.chunk_size), self.list_table_regex)
+            selector = self.selectors['list_table_rows'] if found else selector
+
+        html = parse_html(content, self.encoding)
+        rows = selector(html)[self.list_header_rows:] if html is not None else []
+
+        torrents = []
+        for row in rows:
+            title_element = self.select(row, 'list_title')
+            size_element = self.select(row, 'list_size')
+            seeders_element = self.select(row, 'list_seeders')
+            leechers_element = self.select(row, 'list_leechers')
+            promotion_element = self.select(row, 'list_promotion')
+            hit_and_run_element = self.select(row, 'list_hit_and_run')
+
+            if title_element is None or size_element is None or seeders_element is None or leechers_element is None:
+                self.logger.warning(CannotGetTorrentInformationException())
+                continue
+
+            torrent_id = get_id_from_href(title_element.get('href'))
+            size = convert_to_bytes(get_text(size_element))
+
+            if not torrent_id or not size:
+                self.logger.warning(CannotGetTorrentInformationException())
+                continue
+
+            try:
+                torrent = self.build(
+                    Torrent,
+                    torrent_id=torrent_id,
+                    torrent_name=''.join(title_element.itertext()).strip(),
+                    size=size,
+                    seeders=int(''.join(seeders_element.itertext()).replace(',', '')),
+                    leechers=int(''.join(leechers_element.itertext()).replace(',', '')),
+                    hit_and_run=self.get_hit_and_run(hit_and_run_element.text) if hit_and_run_element is not None else 0,
+                    promotion=self.get_promotion(promotion_element),
+                    crawler=self,
+                )
+            except ValidationError as exception:
+                self.logger.warning(exception)
+            else:
+                torrents.append(torrent)
+
+        return torrents
+
+    def torrent_flow(self, torrent_id: str) -> Flow[Torrent]:
+        response = yield Request(
+            'GET',
+            url=self.base_url + self.detail_path,
+            params={'hit': '1', 'id': torrent_id},
+            timeout=self.timeout
+        )
+
+        if not response.status_code == HTTPStatus.OK:
+            raise RequestException(response)
+
+        html = parse_html(response.content, self.encoding)
+
+        title_element = self.select(html, 'detail_title')
+        size_element = self.select(html, 'detail_size')
+        peers_element = self.select(html, 'detail_peers')
+        promotion_element = self.select(title_element, 'detail_promotion')
+        hit_and_run_element = self.select(html, 'detail_hit_and_run')
+
+        if title_element is None or size_element is None or peers_element is None:
+            raise CannotGetTorrentInformationException()
+
+        size_text = get_text(size_element)
+        size_result = self.regexes['detail_size'].search(size_text)
+        peers_result = self.regexes['detail_peers'].search(get_text(peers_element))
+        if not size_result or not peers_result:
+            raise CannotGetTorrentInformationException()
+
+        size = convert_to_bytes(size_result.group('size'))
+        if not size:
+            raise CannotGetTorrentInformationException()
+
+        hit_and_run = 0
+        if hit_and_run_element is not None:
+            hit_and_run = self.get_hit_and_run(hit_and_run_element.text)
+        elif 'detail_hit_and_run' in self.regexes:
+            result = self.regexes['detail_hit_and_run'].search(size_text)
+            hit_and_run = self.get_hit_and_run(result.group('hit_and_run')) if result else 0
+
+        if self.detail_title_itertext:
+            torrent_name = ''.join(title_element.itertext()).strip()
+        else:
+            torrent_name = (title_element.text or '').strip()
+
+        return self.build(
+            Torrent,
+            torrent_id=torrent_id,
+            torrent_name=torrent_name,
+            size=size,
+            seeders=int(peers_result.group('seeders').replace(',', '')),
+            leechers=int(peers_result.group('leechers').replace(',', '')),
+            promotion=self.get_promotion(promotion_element),
+            crawler=self,
+            hit_and_run=hit_and_run
+        )
+
+    def download_request_flow(self, torrent_id: str) -> Flow[Optional[Request]]:
+        yield from ()
+        return Request(
+            'GET',
+            url=self.base_url + '/download.php',
+            params={'id': torrent_id}
+        )
+
+    def tasks_request(self, user: User, status: Status) -> Request:
+        return Request(
+            'GET',
+            url=self.base_url + '/getusertorrentlistajax.php',
+            params={'userid': user.user_id, 'type': status},
+            timeout=self.timeout
+        )
+
+    def tasks_flow(self) -> Flow[List[Task]]:
+        user = yield from self.cached_user_flow()
+        tasks = []
+
+        for status in [Status.LEECHING, Status.SEEDING]:
+            response = yield self.tasks_request(user, status)
+
+            if not response.status_code == HTTPStatus.OK:
+                self.logger.warning(RequestException(response))
+                continue
+
+            html = parse_html(response.content, self.encoding)
+            rows = self.selectors['task_rows'](html)[1:] if html is not None else []
+
+            for row in rows:
+                title_element = self.select(row, 'task_title')
+                href = title_element.get('href') or '' if title_element is not None else ''
+                torrent_id = get_id_from_href(href)
+                torrent_name = title_element.get('title') if title_element is not None else ''
+
+                if not torrent_name or not torrent_id:
+                    self.logger.warning(CannotGetTorrentInformationException())
+                    continue
+
+                tasks.append(self.build(Task, torrent_id=torrent_id, torrent_name=torrent_name, status=status))
+
+        return tasks
@@ -0,0 +1,82 @@
+from typing import List
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+import numpy
+from numpy.typing import NDArray
+
+from .base import Torrent
+from .base import TorrentBatch
+
+class Candidates:
+    """
+    the columns of one or many torrent batches, possibly of different sites, concatenated into numpy arrays.
+    """
+
+    def __init__(self, batches: Iterable[TorrentBatch]) -> None:
+        self.batches = [batch for batch in batches if len(batch)]
+        self.offsets = numpy.cumsum([len(batch) for batch in self.batches], dtype=numpy.int64)
+
+        def concatenate(name: str, dtype: type) -> NDArray:
+            if not self.batches:
+                return numpy.empty(0, dtype=dtype)
+            return numpy.concatenate([numpy.frombuffer(getattr(batch, name), dtype=dtype) for batch in self.batches])
+
+        self.sizes = concatenate('sizes', numpy.int64)
+        self.seeders = concatenate('seeders', numpy.int64)
+        self.leechers = concatenate('leechers', numpy.int64)
+        self.hit_and_runs = concatenate('hit_and_runs', numpy.int64)
+        self.upload_ratios = concatenate('upload_ratios', numpy.float64)
+        self.download_ratios = concatenate('download_ratios', numpy.float64)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def torrent(self, index: int) -> Torrent:
+        batch_index = int(numpy.searchsorted(self.offsets, index, side='right'))
+        start = int(self.offsets[batch_index - 1]) if batch_index else 0
+        return self.batches[batch_index][index - start]
+
+Score = Callable[[Candidates], NDArray]
+
+def pressure(candidates: Candidates) -> NDArray:
+    """
+    the default score, the leecher per seeder pressure times the upload ratio, per GiB of the torrent.
+    """
+
+    gibibytes = numpy.maximum(candidates.sizes, 1) / 1024 ** 3
+    return candidates.leechers / (candidates.seeders + 1) * candidates.upload_ratios / gibibytes
+
+def select(
+    batches: Iterable[TorrentBatch],
+    count: int,
+    score: Score = pressure,
+    free_only: bool = False,
+    no_hit_and_run: bool = False,
+    min_size: int = 0,
+    max_size: Optional[int] = None
+) -> List[Torrent]:
+    """
+    filters the torrents of the batches, scores them, and returns the `count` best ones, best first.
+    """
+
+    candidates = Candidates(batches)
+    if count <= 0 or candidates.sizes.size == 0:
+        return []
+
+    mask = candidates.sizes >= min_size
+    if max_size is not None:
+        mask &= candidates.sizes <= max_size
+    if free_only:
+        mask &= candidates.download_ratios == 0
+    if no_hit_and_run:
+        mask &= candidates.hit_and_runs == 0
+
+    indexes = numpy.flatnonzero(mask)
+    scores = numpy.asarray(score(candidates), dtype=numpy.float64)[indexes]
+    if count < len(indexes):
+        best = numpy.argpartition(-scores, count - 1)[:count]
+        indexes, scores = indexes[best], scores[best]
+
+    return [candidates.torrent(int(index)) for index in indexes[numpy.argsort(-scores, kind='stable')]]
@@ -1,9 +1,63 @@
+from io import BytesIO
 from math import inf
+from math import isfinite
 from time import time
 from time import sleep
+from time import monotonic
+from json import dumps
+from json import loads
+from gzip import open as open_gzip
+from base64 import b64encode
+from base64 import b64decode
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from threading import Lock
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Tuple
+from typing import Collection
+from typing import Callable
+from typing import Iterator
+from random import Random
+from hashlib import sha1
+from functools import partial
+from email.utils import parsedate_to_datetime
+from os import environ
+from os import makedirs
+from os.path import join
+from os.path import exists
+from os.path import dirname
+from os.path import abspath
+from tempfile import gettempdir
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
 
+from requests import PreparedRequest
+from requests import Response
 from requests import Session as BaseSession
 from requests.adapters import HTTPAdapter as BaseHTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import Timeout
+
+from urllib3.exceptions import NewConnectionError
+
+from .exceptions import RecordingNotFoundException
+
+try:
+    from fcntl import flock
+    from fcntl import LOCK_EX
+    from os import getuid # pylint: disable=ungrouped-imports
+except ImportError: # pragma: no cover
+    flock = None # type: ignore
 
 
 class HTTPAdapter(BaseHTTPAdapter):
@@ -15,18 +69,507 @@ class HTTPAdapter(BaseHTTPAdapter):
         kwargs['timeout'] = kwargs.get('timeout', self.timeout)
         return super().send(*args, **kwargs)
 
+class TokenBucket:
+    """
+    a lock-protected token bucket, refilled at `qps` tokens per second and holding at most `burst` tokens.
+
+    callers reserve a token under the lock and sleep outside of it, the bucket may go into debt, so every
+    caller is served in the order it made its reservation.
+    """
+
+    def __init__(self, qps: float = inf, burst: int = 1) -> None:
+        self.qps = qps
+        self.burst = burst
+        self.tokens = float(burst)
+        self.timestamp = monotonic()
+        self.lock = Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        if self.qps == inf:
+            return 0
+
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.timestamp) * self.qps) - tokens
+            self.timestamp = now
+            return max(-self.tokens / self.qps, 0)
+
+    def acquire(self, tokens: float = 1) -> None:
+        sleep(self.reserve(tokens))
+
+    def defer(self, seconds: float) -> float:
+        """
+        takes a wait of `seconds` out of the budget of the bucket, so the other callers are pushed back as well
+        and retried requests do not burst, returns the seconds the caller has to sleep.
+        """
+
+        if self.qps == inf:
+            return seconds
+        return max(self.reserve(seconds * self.qps), seconds)
+
+class FileTokenBucket(TokenBucket):
+    """
+    a token bucket whose state lives in a file guarded by `flock`, so every process on the host that uses
+    the same `key` draws from one budget. all of them should agree on `qps` and `burst`.
+    """
+
+    def __init__(self, key: str, qps: float = inf, burst: int = 1, directory: Optional[str] = None) -> None:
+        if flock is None: # pragma: no cover
+            raise RuntimeError('a file token bucket needs fcntl, which is not available on this platform')
+
+        super().__init__(qps=qps, burst=burst)
+        directory = directory or self.default_directory()
+        makedirs(directory, mode=0o700, exist_ok=True)
+        self.path = join(directory, sha1(key.encode('utf8')).hexdigest() + '.bucket')
+
+    @staticmethod
+    def default_directory() -> str:
+        """
+        returns a directory private to the current user, so users sharing a host do not share, or fight over, it.
+        """
+
+        runtime_directory = environ.get('XDG_RUNTIME_DIR')
+        if runtime_directory:
+            return join(runtime_directory, 'pt-crawler')
+        return join(gettempdir(), f'pt-crawler-{getuid()}')
+
+    def load(self, state: str, now: float) -> Tuple[float, float]:
+        """
+        returns the tokens and the timestamp stored in a state file, a missing, truncated or corrupt state is a
+        full bucket.
+        """
+
+        try:
+            tokens, timestamp = map(float, state.split())
+        except ValueError:
+            return float(self.burst), now
+
+        if not (isfinite(tokens) and isfinite(timestamp)):
+            return float(self.burst), now
+        return tokens, timestamp
+
+    def reserve(self, tokens: float = 1) -> float:
+        if self.qps == inf:
+            return 0
+
+        with self.lock, open(self.path, 'a+', encoding='utf8') as file:
+            flock(file.fileno(), LOCK_EX)
+            file.seek(0)
+            now = time()
+            stored_tokens, timestamp = self.load(file.read(), now)
+            self.tokens = min(self.burst, stored_tokens + max(now - timestamp, 0) * self.qps) - tokens
+
+            file.seek(0)
+            file.truncate()
+            file.write(f'{self.tokens} {now}')
+            return max(-self.tokens / self.qps, 0)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'TRACE', 'PUT', 'DELETE'})
+
+class RetryPolicy:
+    """
+    decides whether a failed request is sent again and how long to wait before, a request is sent `attempts`
+    times at most.
+
+    responses with a status in `statuses` and connection errors are retried if the request is idempotent, which
+    is the case for the idempotent http methods and for requests sent with `idempotent=True`. 429 and 503 responses
+    and errors while connecting, refused connections and connect timeouts, are retried whatever the method, since
+    the server has not processed the request. which exceptions happened while connecting is told by `connect_error`,
+    `is_connect_error` for `requests`, the async session passes its own.
+
+    the wait is the `Retry-After` of the response, capped at `max_retry_after`, otherwise a random value between 0
+    and `min(max_backoff, backoff * 2 ** retry)`.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        max_retry_after: float = 120,
+        statuses: Collection[int] = (429, 500, 502, 503, 504),
+        seed: Optional[int] = None
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.random = Random(seed)
+
+    def __repr__(self) -> str:
+        return f'<RetryPolicy attempts: {self.attempts}, backoff: {self.backoff}, max_backoff: {self.max_backoff}>'
+
+    def should_retry(
+        self,
+        retry: int,
+        method: str,
+        idempotent: Optional[bool] = None,
+        response: Optional[Response] = None,
+        exception: Optional[BaseException] = None,
+        connect_error: Optional[Callable[[Optional[BaseException]], bool]] = None
+    ) -> bool:
+        if retry + 1 >= self.attempts:
+            return False
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        if response is not None:
+            if response.status_code not in self.statuses:
+                return False
+            return idempotent or response.status_code in (429, 503)
+
+        return idempotent or (connect_error or is_connect_error)(exception)
+
+    def delay(self, retry: int, retry_after: Optional[str] = None) -> float:
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_retry_after)
+        return self.random.uniform(0, min(self.max_backoff, self.backoff * 2 ** retry))
+
+def is_connect_error(exception: Optional[BaseException]) -> bool:
+    """
+    returns whether a request of `requests` failed while connecting, before anything was sent to the server.
+    """
+
+    if isinstance(exception, ConnectTimeout):
+        return True
+
+    # requests reports a refused connection as a ConnectionError wrapping the NewConnectionError of urllib3
+    reason = getattr(exception.args[0], 'reason', None) if isinstance(exception, RequestsConnectionError) and exception.args else None
+    return isinstance(reason, NewConnectionError)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    returns the seconds of a `Retry-After` header, which holds either a number of seconds or an http date.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
+
+CREDENTIAL_PARAMETERS = frozenset({'passkey', 'key', 'uid', 'authkey', 'torrent_pass', 'credential', 'sign', 'token'})
+
+def redact_url(url: str) -> str:
+    """
+    replaces the values of the credential query parameters of `url` with `REDACTED`, other urls are kept as they are.
+    """
+
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(key.lower() in CREDENTIAL_PARAMETERS for key, _ in query):
+        return url
+
+    query = [(key, 'REDACTED' if key.lower() in CREDENTIAL_PARAMETERS else value) for key, value in query]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+class Cassette:
+    """
+    the request and response pairs of a session, stored as gzip compressed json lines in `path`.
+
+    in `record` mode the file is truncated and every response is appended to it. in `replay` mode the responses
+    of a request are served in the order they were recorded, the last one is repeated once they run out. requests
+    are matched by method, url and body, headers are neither matched nor stored, and `Set-Cookie` is dropped.
+
+    the values of the credential query parameters in `CREDENTIAL_PARAMETERS`, like the passkey of the download
+    urls, are redacted from the stored and the matched urls. response bodies are stored as they are, so the user
+    page, which shows the passkey, and json apis returning signed download urls still put secrets into a cassette.
+
+    streamed responses are recorded as they are read, once the body is read to the end or the response is closed,
+    so only the bytes the caller actually read are stored. a flow that stops reading early replays the same way.
+    """
+
+    def __init__(self, path: str, mode: Literal['record', 'replay'] = 'replay') -> None:
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'unknown cassette mode {mode!r}')
+
+        self.path = path
+        self.mode = mode
+        self.lock = Lock()
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self.positions: Dict[str, int] = {}
+
+        if mode == 'record':
+            makedirs(dirname(abspath(path)), exist_ok=True)
+            open_gzip(path, 'wb').close()
+        elif exists(path):
+            with open_gzip(path, 'rt', encoding='utf8') as file:
+                for line in file:
+                    interaction = loads(line)
+                    self.interactions.setdefault(interaction['key'], []).append(interaction)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @staticmethod
+    def key(request: PreparedRequest) -> str:
+        body = request.body.encode('utf8') if isinstance(request.body, str) else request.body or b''
+        return f'{request.method} {redact_url(request.url or "")} {sha1(body).hexdigest()}'
+
+    def record(self, request: PreparedRequest, response: Response, content: bytes) -> None:
+        interaction = {
+            'key': self.key(request),
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'url': redact_url(response.url),
+            'headers': {
+                key: redact_url(value) if key.lower() == 'location' else value
+                for key, value in response.headers.items() if key.lower() != 'set-cookie'
+            },
+            'encoding': response.encoding,
+            'content': b64encode(content).decode('ascii'),
+        }
+
+        with self.lock, open_gzip(self.path, 'at', encoding='utf8') as file:
+            file.write(dumps(interaction) + '\n')
+
+    def play(self, request: PreparedRequest) -> Response:
+        key = self.key(request)
+        with self.lock:
+            interactions = self.interactions.get(key)
+            if not interactions:
+                raise RecordingNotFoundException(request.method, request.url)
+
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            interaction = interactions[min(position, len(interactions) - 1)]
+
+        response = Response()
+        response.status_code = interaction['status_code']
+        response.reason = interaction['reason']
+        response.url = interaction['url']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.encoding = interaction['encoding']
+        response.raw = BytesIO(b64decode(interaction['content']))
+        response.elapsed = timedelta(0)
+        response.request = request
+        return response
+
+class RecordingStream:
+    """
+    wraps the raw stream of a response and hands the bytes read through it to `finish`, once, when the stream is
+    exhausted or closed.
+    """
+
+    def __init__(self, raw: Any, finish: Callable[[bytes], None]) -> None:
+        self.raw = raw
+        self.finish = finish
+        self.content = bytearray()
+        self.finished = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def stream(self, *args: Any, **kwargs: Any) -> Iterator[bytes]:
+        for chunk in self.raw.stream(*args, **kwargs):
+            self.content += chunk
+            yield chunk
+        self.done()
+
+    def read(self, *args: Any, **kwargs: Any) -> bytes:
+        chunk = self.raw.read(*args, **kwargs)
+        self.content += chunk
+        if not chunk:
+            self.done()
+        return chunk
+
+    def close(self) -> None:
+        self.done()
+        self.raw.close()
+
+    def done(self) -> None:
+        if not self.finished:
+            self.finished = True
+            self.finish(bytes(self.content))
+
+# the qps learned by the adaptive rates, by site, new adaptive rates of a site resume from it.
+learned_rates: Dict[str, float] = {}
+
+class AdaptiveRate:
+    """
+    adjusts the qps of a token bucket with additive increase and multiplicative decrease, the qps of the bucket is
+    the starting rate and `max_qps`, which defaults to it, is a hard ceiling.
+
+    every healthy response adds `increase` to the qps. 429 and 503 responses, timeouts and latency spikes, responses
+    slower than `spike_factor` times the moving average, multiply the rate by `decrease`, at most once per `cooldown`
+    seconds, since the responses of the requests already in flight report the same congestion. the rate never goes
+    below `min_qps`.
+
+    the current rate is `qps`, it is also published in `learned_rates` under `key`, usually the base url of the site,
+    and a later rate with the same key starts from it. without a key the rate is neither published nor seeded.
+    every update runs under the lock of the limiter, so threads sharing the rate do not lose each other's changes.
+    the qps of a `FileTokenBucket` is agreed on by every process, so it can not be adapted by one of them.
+    """
+
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        key: str = '',
+        max_qps: Optional[float] = None,
+        min_qps: float = 0.05,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        spike_factor: float = 3,
+        cooldown: float = 1,
+        warmup: int = 10
+    ) -> None:
+        if isinstance(limiter, FileTokenBucket):
+            raise ValueError('the qps of a file token bucket is shared between processes and can not be adapted')
+
+        self.limiter = limiter
+        self.key = key
+        self.max_qps = limiter.qps if max_qps is None else max_qps
+        if self.max_qps == inf:
+            raise ValueError('an adaptive rate needs a finite qps or max_qps')
+
+        self.min_qps = min(min_qps, self.max_qps)
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.cooldown = cooldown
+        self.warmup = warmup
+        self.latency = 0.0
+        self.samples = 0
+        self.decreased_at = -inf
+
+        self.set_qps(learned_rates.get(key, limiter.qps) if key else limiter.qps)
+
+    def __repr__(self) -> str:
+        return f'<AdaptiveRate {self.key} qps: {self.qps:.3f}, min_qps: {self.min_qps}, max_qps: {self.max_qps}>'
+
+    @property
+    def qps(self) -> float:
+        return self.limiter.qps
+
+    def set_qps(self, qps: float) -> None:
+        with self.limiter.lock:
+            self.apply(qps)
+
+    def on_response(self, status_code: int, seconds: float) -> None:
+        with self.limiter.lock:
+            if status_code in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE):
+                self.back_off()
+                return
+
+            spike = self.samples >= self.warmup and seconds > self.spike_factor * self.latency
+            self.latency = seconds if not self.samples else self.latency + (seconds - self.latency) * 0.1
+            self.samples += 1
+
+            if spike:
+                self.back_off()
+            elif status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+                self.apply(self.limiter.qps + self.increase)
+
+    def on_timeout(self) -> None:
+        self.slow_down()
+
+    def slow_down(self) -> None:
+        with self.limiter.lock:
+            self.back_off()
+
+    def apply(self, qps: float) -> None:
+        """
+        sets the qps of the limiter within the bounds, the caller holds the lock of the limiter.
+        """
+
+        self.limiter.qps = min(max(qps, self.min_qps), self.max_qps)
+        if self.key:
+            learned_rates[self.key] = self.limiter.qps
+
+    def back_off(self) -> None:
+        """
+        decreases the qps unless it was decreased less than `cooldown` seconds ago, the caller holds the lock of the
+        limiter.
+        """
+
+        now = monotonic()
+        if now - self.decreased_at < self.cooldown:
+            return
+
+        self.decreased_at = now
+        self.apply(self.limiter.qps * self.decrease)
+
 class Session(BaseSession):
-    def __init__(self, *args, qps: float = inf, timeout: int = 1, **kwargs): # type: ignore
+    """
+    a requests session limited to `qps` requests per second. with a `cassette` in `record` mode the responses are
+    also written to it, in `replay` mode they are served from it, without the network or the rate limiter.
+
+    with a `retry` policy, failed requests are sent again, every attempt takes a token and the waits in between are
+    taken out of the budget of the limiter. `request` accepts `idempotent=True` for requests that are safe to repeat
+    although their method is not, like searches sent with POST.
+
+    with an `adaptive` rate, the status and the latency of every response adjust the qps of the limiter.
+    """
+
+    def __init__( # type: ignore
+        self,
+        *args,
+        qps: float = inf,
+        burst: int = 1,
+        timeout: int = 1,
+        limiter: Optional[TokenBucket] = None,
+        cassette: Optional[Cassette] = None,
+        retry: Optional[RetryPolicy] = None,
+        adaptive: Optional[AdaptiveRate] = None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
         self.mount('http://', HTTPAdapter(timeout=timeout))
         self.mount('https://', HTTPAdapter(timeout=timeout))
-        self.interval = 1 / qps
-        self.last_request_time = time() - self.interval
+        self.limiter = limiter or TokenBucket(qps=qps, burst=burst)
+        self.cassette = cassette
+        self.retry = retry
+        self.adaptive = adaptive
+
+    def request(self, method, url, *args, idempotent=None, **kwargs): # type: ignore
+        replaying = self.cassette is not None and self.cassette.replaying
+        retry = 0
+        while True:
+            if not replaying:
+                self.limiter.acquire()
+
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (RequestsConnectionError, Timeout) as exception:
+                if self.adaptive is not None and isinstance(exception, Timeout):
+                    self.adaptive.on_timeout()
+                if self.retry is None or not self.retry.should_retry(retry, method, idempotent, exception=exception):
+                    raise
+                delay = self.retry.delay(retry)
+            else:
+                if self.adaptive is not None and not replaying:
+                    self.adaptive.on_response(response.status_code, response.elapsed.total_seconds())
+                if self.retry is None or not self.retry.should_retry(retry, method, idempotent, response=response):
+                    return response
+                delay = self.retry.delay(retry, response.headers.get('Retry-After'))
+                response.close()
+
+            retry += 1
+            if not replaying:
+                sleep(self.limiter.defer(delay))
+
+    def send(self, request, **kwargs): # type: ignore
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.play(request)
 
-    def request(self, *args,**kwargs): # type: ignore
-        sleep_time = max(self.last_request_time + self.interval - time(), 0)
-        sleep(sleep_time)
+        response = super().send(request, **kwargs)
+        if self.cassette is None:
+            return response
 
-        response = super().request(*args, **kwargs)
-        self.last_request_time = time()
+        if kwargs.get('stream'):
+            response.raw = RecordingStream(response.raw, partial(self.cassette.record, request, response))
+        else:
+            self.cassette.record(request, response, response.content)
         return response
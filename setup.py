@@ -21,6 +21,7 @@ setup(
     description='a group of crawlers for private tracker website',
     packages=find_packages(),
     install_requires=install_requires,
+    extras_require={'selection': ['numpy']},
     long_description=long_description,
     long_description_content_type='text/markdown',
     package_data={"crawlers": ["py.typed"]}
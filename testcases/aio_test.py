@@ -0,0 +1,161 @@
+from time import monotonic
+from asyncio import run
+from asyncio import gather
+from asyncio import TimeoutError as AsyncTimeoutError
+
+from pytest import raises
+from aiohttp import ClientConnectorError
+from aiohttp import ConnectionTimeoutError
+from aiohttp import SocketTimeoutError
+
+from crawlers import OurBits
+from crawlers import MTeam
+from crawlers.aio import AsyncCrawler
+from crawlers.aio import AsyncSession
+from crawlers.aio import is_connect_error
+from crawlers.base import DownloadStatus
+from crawlers.session import RetryPolicy
+from crawlers.session import learned_rates
+
+from benchmarks.tracker import Tracker
+
+def test_blocking_and_async_flows_agree(dummy):
+    crawler = dummy(qps=100)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await async_crawler.get_user(), await async_crawler.get_torrents(pages=2)
+
+    user, torrents = run(main())
+    assert user == crawler.get_user()
+    assert [torrent.torrent_id for torrent in torrents] == [torrent.torrent_id for torrent in crawler.get_torrents(pages=2)]
+
+def test_async_get_torrents_as_batch(dummy):
+    crawler = dummy(qps=100)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            batches = [batch async for batch in async_crawler.iter_torrents(pages=2, batch=True)]
+            return batches, await async_crawler.get_torrents(pages=2, batch=True)
+
+    batches, batch = run(main())
+    assert [len(page) for page in batches] == [10, 10]
+    assert batch.torrent_ids == [torrent.torrent_id for torrent in crawler.get_torrents(pages=2)]
+
+def test_async_crawler_respects_qps(dummy):
+    crawler = dummy(qps=10)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await gather(*[async_crawler.get_user() for _ in range(6)])
+
+    now = monotonic()
+    users = run(main())
+    escape = monotonic() - now
+
+    assert [user.user_name for user in users] == ['kinopico'] * 6
+    assert escape > 0.45
+
+def test_async_concurrent_pages(dummy):
+    crawler = dummy(qps=100, burst=10)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await async_crawler.get_torrents(pages=8, concurrency=4)
+
+    now = monotonic()
+    torrents = run(main())
+    escape = monotonic() - now
+
+    assert [int(torrent.torrent_id) for torrent in torrents] == list(range(50))
+    assert escape < 0.45
+
+def test_async_download_torrents(dummy, tmp_path):
+    crawler = dummy(qps=100, burst=10)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await async_crawler.download_torrents(['1', '1', 'x', '../1'], str(tmp_path), concurrency=2)
+
+    results = run(main())
+    assert [result.status for result in results.values()] == [DownloadStatus.DOWNLOADED, DownloadStatus.FAILED, DownloadStatus.FAILED]
+    assert results['../1'].error == 'invalid torrent id'
+    assert [path.name for path in tmp_path.iterdir()] == ['1.torrent']
+
+def test_async_download_torrent_is_atomic(dummy, tmp_path):
+    file_path = tmp_path / 'demo.torrent'
+
+    async def main(crawler):
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await async_crawler.download_torrent('12345678', str(file_path))
+
+    assert not run(main(dummy(qps=100, max_torrent_size=8)))
+    assert not list(tmp_path.iterdir())
+    assert run(main(dummy(qps=100)))
+    assert file_path.read_bytes() == b'd4:name8:12345678e'
+
+def test_async_fetch_torrent_bytes(dummy):
+    async def main(crawler):
+        async with AsyncCrawler(crawler) as async_crawler:
+            return await async_crawler.fetch_torrent_bytes('12345')
+
+    assert run(main(dummy(qps=100))) == b'd4:name5:12345e'
+    assert run(main(dummy(qps=100, max_torrent_size=8))) is None
+
+def test_async_crawler_retries_transient_errors():
+    with Tracker(OurBits, rows=5, pages=3, error_rate=0.5, error_status=503, seed=1) as tracker:
+        crawler = OurBits(headers={}, base_url=tracker.base_url, qps=100, retry=RetryPolicy(attempts=10, backoff=0.01))
+
+        async def main():
+            async with AsyncCrawler(crawler) as async_crawler:
+                return await async_crawler.get_torrents(pages=3)
+
+        assert len(run(main())) == 15
+        assert tracker.statuses[503] > 0
+
+def test_async_crawler_uses_the_timeout_of_the_crawler():
+    with Tracker(MTeam, rows=5, pages=1, latency=1.2) as tracker:
+        async def main(crawler):
+            async with AsyncCrawler(crawler) as async_crawler:
+                return await async_crawler.get_torrents()
+
+        assert len(run(main(MTeam(headers={}, base_url=tracker.base_url, qps=100)))) == 5
+        assert len(run(main(MTeam(headers={}, base_url=tracker.base_url, qps=100, timeout=5)))) == 5
+        with raises(AsyncTimeoutError):
+            run(main(MTeam(headers={}, base_url=tracker.base_url, qps=100, timeout=0.5)))
+
+def test_async_connect_errors_are_retried_whatever_the_method():
+    policy = RetryPolicy(attempts=3)
+    assert policy.should_retry(0, 'POST', exception=ConnectionTimeoutError(), connect_error=is_connect_error)
+    assert not policy.should_retry(0, 'POST', exception=SocketTimeoutError(), connect_error=is_connect_error)
+    assert not policy.should_retry(0, 'POST', exception=ConnectionTimeoutError())
+
+def test_async_session_retries_refused_posts(closed_url):
+    delays = []
+    policy = RetryPolicy(attempts=3, backoff=0)
+    policy.delay = lambda retry, retry_after=None: delays.append(retry) or 0
+
+    async def main():
+        session = AsyncSession(retry=policy)
+        try:
+            await session.request('POST', closed_url + '/takelogin.php')
+        finally:
+            await session.close()
+
+    with raises(ClientConnectorError):
+        run(main())
+    assert delays == [0, 1]
+
+def test_async_latency_excludes_the_wait_for_the_limiter(dummy, base_url):
+    learned_rates.pop(base_url, None)
+    crawler = dummy(qps=20, adaptive=True)
+
+    async def main():
+        async with AsyncCrawler(crawler) as async_crawler:
+            for _ in range(12):
+                await async_crawler.get_user()
+            await gather(*[async_crawler.get_user() for _ in range(20)])
+
+    run(main())
+    assert crawler.session.adaptive.qps >= 20
+    assert crawler.session.adaptive.latency < 0.1
@@ -0,0 +1,260 @@
+from re import IGNORECASE
+from re import compile as compile_pattern
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import mark
+from pytest import raises
+
+from crawlers import base
+from crawlers.base import DownloadStatus
+from crawlers.base import AtomicFile
+from crawlers.base import limit_size
+from crawlers.base import parse_html
+from crawlers.base import get_html_parser
+from crawlers.base import cut_table
+from crawlers.base import Promotion
+from crawlers.base import TorrentBatch
+from crawlers.exceptions import TorrentTooLargeException
+
+@mark.parametrize('concurrency', [1, 4])
+def test_get_torrents_keeps_page_order(dummy, concurrency):
+    crawler = dummy(qps=100, burst=10)
+    torrents = crawler.get_torrents(pages=8, concurrency=concurrency)
+    assert [int(torrent.torrent_id) for torrent in torrents] == list(range(50))
+
+def test_get_torrents_concurrently(dummy):
+    crawler = dummy(qps=100, burst=10)
+
+    now = monotonic()
+    crawler.get_torrents(pages=4)
+    sequential = monotonic() - now
+
+    now = monotonic()
+    crawler.get_torrents(pages=4, concurrency=4)
+    concurrent = monotonic() - now
+
+    assert concurrent < sequential / 2
+
+def test_get_torrents_concurrently_respects_qps(dummy):
+    crawler = dummy(qps=10)
+
+    now = monotonic()
+    crawler.get_torrents(pages=5, concurrency=5)
+    escape = monotonic() - now
+
+    assert escape > 0.4
+
+def test_iter_torrents_streams_pages(dummy):
+    crawler = dummy(qps=100)
+    assert [int(torrent.torrent_id) for torrent in crawler.iter_torrents(pages=3)] == list(range(30))
+
+@mark.parametrize('concurrency', [1, 3])
+def test_iter_torrents_stops_early(dummy, handler, concurrency):
+    crawler = dummy(qps=100, burst=10)
+
+    for torrent in crawler.iter_torrents(pages=5, concurrency=concurrency):
+        if torrent.torrent_id == '3':
+            break
+
+    assert handler.counter <= concurrency
+
+@mark.parametrize(
+    'since_torrent_id, requests, count', [
+        ('45', 1, 4),
+        ('39', 2, 10),
+        ('35', 2, 14),
+        ('-1', 6, 50),
+    ]
+)
+def test_get_new_torrents(dummy, handler, since_torrent_id, requests, count):
+    crawler = dummy(qps=100)
+    torrents = crawler.get_new_torrents(since_torrent_id, pages=10, order='desc')
+
+    assert len(torrents) == count
+    assert all(int(torrent.torrent_id) > int(since_torrent_id) for torrent in torrents)
+    assert handler.counter == requests
+
+def test_user_cache(dummy, handler):
+    crawler = dummy(qps=100, user_ttl=60)
+
+    crawler.get_tasks()
+    crawler.get_tasks()
+    assert handler.counter == 1
+
+    crawler.get_user()
+    assert handler.counter == 2
+
+    crawler.get_tasks()
+    assert handler.counter == 2
+
+    crawler.invalidate_user()
+    crawler.get_tasks()
+    assert handler.counter == 3
+
+def test_user_cache_expires(dummy, handler):
+    crawler = dummy(qps=100, user_ttl=0)
+
+    crawler.get_tasks()
+    crawler.get_tasks()
+    assert handler.counter == 2
+
+def test_download_torrents(dummy, handler, tmp_path):
+    crawler = dummy(qps=100, burst=10)
+    (tmp_path / '2.torrent').write_bytes(b'existed')
+
+    results = crawler.download_torrents(['1', '2', '1', 'x', '3'], str(tmp_path), concurrency=3)
+
+    assert list(results) == ['1', '2', 'x', '3']
+    assert [result.status for result in results.values()] == [
+        DownloadStatus.DOWNLOADED,
+        DownloadStatus.SKIPPED,
+        DownloadStatus.FAILED,
+        DownloadStatus.DOWNLOADED
+    ]
+    assert handler.counter == 3
+    assert (tmp_path / '1.torrent').read_bytes() == b'd4:name1:1e'
+    assert (tmp_path / '2.torrent').read_bytes() == b'existed'
+
+def test_download_torrent_is_atomic(dummy, tmp_path):
+    file_path = tmp_path / 'demo.torrent'
+
+    assert dummy(qps=100).download_torrent('12345', str(file_path))
+    assert file_path.read_bytes() == b'd4:name5:12345e'
+
+    assert not dummy(qps=100, max_torrent_size=8).download_torrent('12345678', str(file_path))
+    assert file_path.read_bytes() == b'd4:name5:12345e'
+    assert [path.name for path in tmp_path.iterdir()] == ['demo.torrent']
+
+def test_atomic_file_removes_partial_file(tmp_path):
+    file_path = tmp_path / 'demo.torrent'
+
+    with raises(TorrentTooLargeException):
+        with AtomicFile(str(file_path)) as file:
+            for chunk in limit_size([b'1234', b'5'], max_size=4):
+                file.write(chunk)
+
+    assert not list(tmp_path.iterdir())
+
+    with raises(TorrentTooLargeException):
+        next(limit_size([b'1234'], max_size=4, expected_size=5))
+
+def test_atomic_file_cleans_up_failed_commits(tmp_path, monkeypatch):
+    def fail(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(base, 'fsync', fail)
+    with raises(OSError):
+        with AtomicFile(str(tmp_path / 'demo.torrent')) as file:
+            file.write(b'1234')
+    assert not list(tmp_path.iterdir())
+
+    monkeypatch.undo()
+    monkeypatch.setattr(base, 'replace', fail)
+    with raises(OSError):
+        with AtomicFile(str(tmp_path / 'demo.torrent')) as file:
+            file.write(b'1234')
+    assert not list(tmp_path.iterdir())
+
+def test_atomic_file_syncs_the_directory(tmp_path, monkeypatch):
+    directories = []
+    monkeypatch.setattr(base, 'fsync_directory', directories.append)
+
+    with AtomicFile(str(tmp_path / 'demo.torrent')) as file:
+        file.write(b'1234')
+
+    assert directories == [str(tmp_path)]
+    assert (tmp_path / 'demo.torrent').read_bytes() == b'1234'
+
+def test_fetch_torrent_bytes(dummy, tmp_path):
+    crawler = dummy(qps=100)
+
+    assert crawler.fetch_torrent_bytes('12345') == b'd4:name5:12345e'
+    assert crawler.fetch_torrent_bytes('x') is None
+    assert dummy(qps=100, max_torrent_size=8).fetch_torrent_bytes('12345') is None
+    assert crawler.get_torrents()[0].fetch() == b'd4:name1:0e'
+    assert not list(tmp_path.iterdir())
+
+@mark.parametrize('encoding', ['utf8', 'gbk'])
+def test_parse_html(encoding):
+    html = parse_html('<html><body><h1 id="top">种子</h1></body></html>'.encode(encoding), encoding)
+
+    assert html.xpath('string(//*[@id="top"])') == '种子'
+    assert parse_html(b'') is None
+
+def test_html_parsers_are_reused_per_thread():
+    assert get_html_parser('utf8') is get_html_parser('utf8')
+    assert get_html_parser('utf8') is not get_html_parser('gbk')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(get_html_parser, 'utf8').result() is not get_html_parser('utf8')
+
+@mark.parametrize('chunk_size', [1, 7, 1024])
+def test_cut_table(chunk_size):
+    page = b'<html><table id="news"></table><TABLE class="torrents"><tr><td><table></table></td></tr></TABLE><div>footer</div></html>'
+    chunks = [page[index:index + chunk_size] for index in range(0, len(page), chunk_size)]
+    consumed = []
+
+    def read():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    content, found = cut_table(read(), compile_pattern(rb'<table[^>]*class="torrents"', IGNORECASE))
+
+    assert found
+    assert content == b'<TABLE class="torrents"><tr><td><table></table></td></tr></table>'
+    assert len(b''.join(consumed)) < len(page) or chunk_size == 1024
+
+def test_cut_table_without_table():
+    page = b'<html><table></table></html>'
+    assert cut_table([page[:5], page[5:]], compile_pattern(rb'<table[^>]*class="torrents"')) == (page, False)
+
+def test_promotions_are_interned():
+    promotion = Promotion.intern(upload_ratio=2, download_ratio=0.5)
+
+    assert Promotion.intern(upload_ratio=2.0, download_ratio=0.5) is promotion
+    assert Promotion.intern(upload_ratio=1, download_ratio=0.5) is not promotion
+    with raises(ValueError):
+        promotion.upload_ratio = 1
+
+def test_get_torrents_as_batch(dummy):
+    crawler = dummy(qps=100, burst=10)
+    torrents = crawler.get_torrents(pages=2)
+    batch = crawler.get_torrents(pages=2, batch=True)
+
+    assert isinstance(batch, TorrentBatch)
+    assert len(batch) == len(torrents) == 20
+    assert list(batch) == torrents
+    assert batch[-1] == torrents[-1]
+    assert batch[-1].promotion is torrents[-1].promotion
+    assert list(batch[5:8]) == torrents[5:8]
+    assert list(batch.sizes) == [torrent.size for torrent in torrents]
+
+    with raises(IndexError):
+        batch[20] # pylint: disable=pointless-statement
+
+    with raises(ValueError):
+        TorrentBatch(dummy(), torrents)
+
+def test_iter_torrents_as_batches(dummy):
+    batches = list(dummy(qps=100, burst=10).iter_torrents(pages=3, batch=True))
+    assert [[int(torrent_id) for torrent_id in batch.torrent_ids] for batch in batches] == [list(range(page * 10, page * 10 + 10)) for page in range(3)]
+
+@mark.parametrize('torrent_id', ['../1', '/tmp/1', '1/../../1', '..', ''])
+def test_download_torrents_rejects_unsafe_ids(dummy, handler, tmp_path, torrent_id):
+    directory = tmp_path / 'torrents'
+    results = dummy(qps=100).download_torrents([torrent_id, '1'], str(directory))
+
+    assert results[torrent_id].status == DownloadStatus.FAILED
+    assert results['1'].status == DownloadStatus.DOWNLOADED
+    assert handler.counter == 1
+    assert sorted(path.name for path in tmp_path.rglob('*')) == ['1.torrent', 'torrents']
+
+def test_options_after_timeout_are_keyword_only(dummy):
+    crawler = dummy(qps=100, timeout=5)
+    assert crawler.timeout == 5
+    assert crawler.burst == 1
+
+    with raises(TypeError):
+        type(crawler)({}, '', None, None, 100, 5, 10) # pylint: disable=too-many-function-args
@@ -1,4 +1,22 @@
+from json import dumps
+from time import sleep
+from socket import socket
+from threading import Thread
+from http.server import ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+
 from pytest import fixture
+from requests import Response
+
+from crawlers.base import Crawler
+from crawlers.base import Request
+from crawlers.base import User
+from crawlers.base import Torrent
+from crawlers.base import Promotion
+from crawlers.base import Task
+from crawlers.base import Status
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -12,3 +30,113 @@ def pytest_addoption(parser):
 @fixture(name='proxy', scope='session')
 def _proxy(request):
     return request.config.getoption('proxy')
+
+class Handler(BaseHTTPRequestHandler):
+    pages = 5
+    page_size = 10
+    delay = 0.1
+    counter = 0
+
+    def do_GET(self): # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        Handler.counter += 1
+
+        if url.path == '/user':
+            body = query.get('name', ['anonymous'])[0]
+        elif url.path == '/torrents':
+            sleep(self.delay)
+            page = int(query['page'][0])
+            torrent_ids = [page * self.page_size + index for index in range(self.page_size)]
+            if query.get('order') == ['desc']:
+                torrent_ids = [self.pages * self.page_size - 1 - torrent_id for torrent_id in torrent_ids]
+            body = ','.join(map(str, torrent_ids)) if page < self.pages else ''
+        elif url.path == '/download' and query['id'][0].isdigit():
+            body = f'd4:name{len(query["id"][0])}:{query["id"][0]}e'
+        else:
+            self.send_error(404)
+            return
+
+        content = body.encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+class Dummy(Crawler):
+    def user_flow(self):
+        response = yield Request('GET', url=self.base_url + '/user', params={'name': 'kinopico'})
+        return User(user_id='1', user_name=response.text, upload_bytes=0, download_bytes=0, email=None, bonus=0)
+
+    def torrents_page_flow(self, page, order='asc'):
+        response = yield Request('GET', url=self.base_url + '/torrents', params={'page': str(page), 'order': order})
+        if not response.text:
+            return None
+
+        return [
+            Torrent(
+                torrent_id=torrent_id,
+                torrent_name=f'torrent {torrent_id}',
+                size=1024,
+                seeders=1,
+                leechers=1,
+                hit_and_run=0,
+                promotion=Promotion.intern(upload_ratio=1, download_ratio=1),
+                crawler=self
+            )
+            for torrent_id in response.text.split(',')
+        ]
+
+    def torrent_flow(self, torrent_id):
+        raise NotImplementedError()
+
+    def download_request_flow(self, torrent_id):
+        yield from ()
+        return Request('GET', url=self.base_url + '/download', params={'id': torrent_id})
+
+    def tasks_flow(self):
+        user = yield from self.cached_user_flow()
+        return [Task(torrent_id='1', torrent_name=user.user_name, status=Status.SEEDING)]
+
+@fixture(name='base_url', scope='session')
+def _base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+@fixture(name='closed_url')
+def _closed_url():
+    with socket() as listener:
+        listener.bind(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
+
+@fixture(name='handler')
+def _handler():
+    Handler.counter = 0
+    return Handler
+
+@fixture(name='dummy', scope='session')
+def _dummy(base_url):
+    return lambda **kwargs: Dummy(headers={}, base_url=base_url, **kwargs)
+
+@fixture(name='decode', scope='session')
+def _decode():
+    def decode(flow, payload):
+        response = Response()
+        response.status_code = 200
+        response._content = dumps(payload).encode('utf8') # pylint: disable=protected-access
+
+        next(flow)
+        try:
+            flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+        raise AssertionError('the flow sent more than one request')
+    return decode
@@ -0,0 +1,30 @@
+from pytest import mark
+
+from benchmarks.fixtures import EMAIL, USER_ID, USER_NAME
+from benchmarks.fixtures import load_fixtures, synthetic_torrents
+from benchmarks.parsers import CRAWLERS
+from benchmarks.parsers import replay
+
+@mark.parametrize('crawler_class', CRAWLERS, ids=lambda crawler_class: crawler_class.__name__)
+def test_crawlers_parse_their_fixtures(crawler_class):
+    crawler = crawler_class(headers={'Cookie': 'anonymous'})
+    fixtures = load_fixtures(crawler_class, rows=10)
+    expected = synthetic_torrents(10)
+
+    user = replay(crawler, crawler.user_flow(), fixtures)
+    assert user.user_id == USER_ID
+    assert user.user_name == USER_NAME
+    assert user.email in (EMAIL, None)
+
+    torrents = replay(crawler, crawler.torrents_page_flow(0), fixtures)
+    assert [torrent.torrent_id for torrent in torrents] == [torrent.torrent_id for torrent in expected]
+    assert [torrent.seeders for torrent in torrents] == [torrent.seeders for torrent in expected]
+    assert [torrent.leechers for torrent in torrents] == [torrent.leechers for torrent in expected]
+    assert torrents[0].promotion.download_ratio == 0
+
+    torrent = replay(crawler, crawler.torrent_flow(expected[0].torrent_id), fixtures)
+    assert torrent.torrent_name == expected[0].name
+    assert torrent.size == torrents[0].size
+
+    tasks = replay(crawler, crawler.tasks_flow(), fixtures)
+    assert {task.torrent_id for task in tasks} == {torrent.torrent_id for torrent in expected}
@@ -4,6 +4,7 @@ from time import time
 from tempfile import NamedTemporaryFile
 
 from pytest import fixture
+from pytest import mark
 from loguru import logger
 from torrent_parser import parse_torrent_file
 
@@ -63,3 +64,17 @@ def test_get_tasks(crawler):
     tasks = crawler.get_tasks()
     for task in tasks:
         print(task)
+
+@mark.parametrize('trusted', [False, True])
+def test_decode_torrents(decode, trusted):
+    items = [
+        {'tid': 1, 'title': 'Foo', 'fileSize': '1.50 GB', 'peers': {'upload': 3, 'download': 0}, 'status': {'upCoefficient': 2, 'downCoefficient': 0}},
+        {'tid': 2, 'title': 'Bar', 'fileSize': 'unknown', 'peers': {'upload': 3, 'download': 0}, 'status': {'upCoefficient': 1, 'downCoefficient': 1}},
+        {'tid': 3, 'title': 'Baz', 'fileSize': '700 MB', 'status': {'upCoefficient': 1, 'downCoefficient': 1}},
+    ]
+    crawler = FSM(headers={}, trusted=trusted)
+    torrents = decode(crawler.torrents_page_flow(0), {'data': {'list': items}})
+
+    assert [(torrent.torrent_id, torrent.size, torrent.seeders) for torrent in torrents] == [('1', 1.5 * 1024 ** 3, 3)]
+    assert (torrents[0].promotion.upload_ratio, torrents[0].promotion.download_ratio) == (2, 0)
+    assert decode(crawler.torrent_flow('1'), {'data': {'torrent': items[0]}}).torrent_name == 'Foo'
@@ -0,0 +1,33 @@
+from sys import executable
+from subprocess import run
+
+from pytest import mark
+from pytest import raises
+
+import crawlers
+
+def imported_modules(statement):
+    script = f'import sys\n{statement}\nprint(" ".join(sys.modules))'
+    return run([executable, '-c', script], capture_output=True, check=True, text=True).stdout.split()
+
+def test_import_crawlers_is_lazy():
+    modules = imported_modules('import crawlers')
+
+    assert 'crawlers' in modules
+    assert not [module for module in modules if module.startswith('crawlers.')]
+    assert 'requests' not in modules
+    assert 'pydantic' not in modules
+
+@mark.parametrize('name, module', [('MTeam', 'crawlers.mteam'), ('CHDBits', 'crawlers.chdbits'), ('Torrent', 'crawlers.base')])
+def test_import_single_crawler(name, module):
+    modules = imported_modules(f'from crawlers import {name}')
+
+    assert module in modules
+    assert not {'crawlers.ttg', 'crawlers.fsm', 'crawlers.u2'} & set(modules)
+    assert 'aiohttp' not in modules
+
+def test_lazy_attributes():
+    assert crawlers.MTeam is crawlers.mteam.MTeam
+    assert 'LemonHD' in dir(crawlers)
+    with raises(AttributeError):
+        crawlers.Missing # pylint: disable=no-member,pointless-statement
@@ -72,3 +72,19 @@ def test_get_tasks(crawler):
     tasks = crawler.get_tasks(page_size=10)
     print(len([item for item in tasks if item.status == Status.SEEDING]))
     print(len([item for item in tasks if item.status == Status.LEECHING]))
+
+@mark.parametrize('trusted', [False, True])
+def test_decode_torrents(decode, trusted):
+    items = [
+        {'id': '1', 'name': 'Foo', 'size': '1024', 'status': {'seeders': '3', 'leechers': '0', 'discount': 'PERCENT_50'}},
+        {'id': '2', 'name': 'Bar', 'size': 'unknown', 'status': {'seeders': '3', 'leechers': '0', 'discount': 'FREE'}},
+        {'id': '3', 'name': 'Baz', 'size': 2048, 'status': {'seeders': 5, 'leechers': 1}},
+        {'id': '4', 'name': 'Qux', 'size': 4096, 'status': {'seeders': 5, 'leechers': 1, 'discount': 'UNKNOWN'}},
+    ]
+    crawler = MTeam(headers={}, trusted=trusted)
+    torrents = decode(crawler.torrents_page_flow(0), {'code': '0', 'message': 'SUCCESS', 'data': {'data': items}})
+
+    assert [(torrent.torrent_id, torrent.size, torrent.seeders) for torrent in torrents] == [('1', 1024, 3), ('4', 4096, 5)]
+    assert [torrent.promotion.download_ratio for torrent in torrents] == [0.5, 1]
+    assert decode(crawler.torrents_page_flow(0), {'code': '1', 'message': 'ERROR', 'data': None}) is None
+    assert decode(crawler.torrent_flow('1'), {'code': '0', 'message': 'SUCCESS', 'data': items[0]}).torrent_name == 'Foo'
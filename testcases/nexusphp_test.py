@@ -0,0 +1,170 @@
+from urllib.parse import urlparse
+
+from lxml import etree # pylint: disable=c-extension-no-member
+from requests import Response
+from pytest import mark
+
+from crawlers import NexusPHP
+from crawlers import U2
+from crawlers.base import Status
+
+USER_PAGE = '''
+<html><body>
+<table id="info_block"><tr><td><table><tr><td>
+欢迎回来, <span><span><a href="userdetails.php?id=42">alice</a></span></span> [退出]
+魔力值 [使用]: 1,234.5 上传量: 1.50 TB 下载量: 512.00 GB [签到]
+</td></tr></table></td></tr></table>
+<table>
+<tr><td>邮箱地址</td><td>alice@example.com</td></tr>
+<tr><td>密钥</td><td>0123456789abcdef</td></tr>
+</table>
+</body></html>
+'''
+
+TORRENTS_PAGE = '''
+<html><body><table class="torrents">
+<tr><td>header</td></tr>
+<tr>
+<td>movie</td>
+<td><a href="details.php?id=2&amp;hit=1">Foo <b>2024</b></a><img class="pro_free"/><div class="circle-text">h3</div></td>
+<td></td><td></td><td>1.50<br/>GB</td><td>1,024</td><td>7</td>
+</tr>
+<tr>
+<td>movie</td>
+<td><a href="details.php?id=1&amp;hit=1">Bar</a><img class="pro_50pctdown2up"/></td>
+<td></td><td></td><td>700.00&#160;MB</td><td>3</td><td>0</td>
+</tr>
+<tr><td>broken</td></tr>
+</table></body></html>
+'''
+
+DETAIL_PAGE = '''
+<html><body>
+<h1 id="top">Foo 2024 <img class="pro_free"/></h1>
+<table>
+<tr><td>基本信息</td><td>大小：1.50 GB&#160;&#160;类型: 电影 H&amp;R: h5</td></tr>
+<tr><td>同伴</td><td>1,024 个做种者 | 7 个下载者</td></tr>
+</table>
+</body></html>
+'''
+
+TASKS_PAGE = '''
+<html><body><table>
+<tr><td>header</td></tr>
+<tr><td></td><td><a href="details.php?id=2" title="Foo 2024"></a></td></tr>
+<tr><td></td><td><a href="details.php" title="broken"></a></td></tr>
+</table></body></html>
+'''
+
+class Site(NexusPHP):
+    base_url = 'https://nexusphp.test'
+    hr_policy = {'h3': 3 * 24 * 3600, 'h5': 5 * 24 * 3600}
+
+    xpaths = {
+        'list_rows': '//table[@class="torrents"]/tr',
+        'list_hit_and_run': './/div[@class="circle-text"]',
+        'detail_promotion': './/img[starts-with(@class, "pro_")]',
+    }
+    patterns = {
+        'user': r'.*'.join(
+            [
+                r'欢迎回来, (?P<user_name>.+) \[退出\]',
+                r'魔力值 \[使用\]: (?P<bonus>{number}) ',
+                r'上传量: (?P<upload_number>{number}) (?P<upload_unit>{unit}) ',
+                r'下载量: (?P<download_number>{number}) (?P<download_unit>{unit}) '
+            ]
+        ),
+        'detail_hit_and_run': r'H&R: ?(?P<hit_and_run>\S+)',
+    }
+
+def build_response(text):
+    response = Response()
+    response.status_code = 200
+    response.encoding = 'utf8'
+    response._content = text.encode('utf8') # pylint: disable=protected-access
+    response._content_consumed = True # pylint: disable=protected-access
+    return response
+
+def run(flow, pages):
+    try:
+        request = next(flow)
+        while True:
+            request = flow.send(build_response(pages[urlparse(request.url).path]))
+    except StopIteration as stop:
+        return stop.value
+
+def test_spec_is_compiled_once():
+    assert isinstance(Site.selectors['list_rows'], etree.XPath) # pylint: disable=c-extension-no-member
+    assert Site.selectors['list_size'] is not NexusPHP.selectors.get('list_size')
+    assert Site.regexes['user'].pattern.count(Site.number_pattern) == 3
+    assert 'detail_hit_and_run' not in NexusPHP.regexes
+
+def test_user_flow():
+    user = run(Site(headers={}).user_flow(), {'/usercp.php': USER_PAGE})
+
+    assert user.user_id == '42'
+    assert user.user_name == 'alice'
+    assert user.email == 'alice@example.com'
+    assert user.passkey == '0123456789abcdef'
+    assert user.bonus == 1234.5
+    assert user.upload_bytes == 1.5 * 1024 ** 4
+    assert user.download_bytes == 512 * 1024 ** 3
+
+def test_torrents_page_flow():
+    first, second = run(Site(headers={}).torrents_page_flow(0), {'/torrents.php': TORRENTS_PAGE})
+
+    assert first.torrent_id == '2'
+    assert first.torrent_name == 'Foo 2024'
+    assert first.size == 1.5 * 1024 ** 3
+    assert first.seeders == 1024
+    assert first.leechers == 7
+    assert first.hit_and_run == 3 * 24 * 3600
+    assert (first.promotion.upload_ratio, first.promotion.download_ratio) == (1, 0)
+
+    assert second.torrent_id == '1'
+    assert second.size == 700 * 1024 ** 2
+    assert second.hit_and_run == 0
+    assert (second.promotion.upload_ratio, second.promotion.download_ratio) == (2, 0.5)
+
+@mark.parametrize('list_table', [rb'<table[^>]*class="torrents"', rb'<table[^>]*id="missing"'])
+def test_torrents_page_flow_parses_the_torrent_table(list_table):
+    streaming_site = type('StreamingSite', (Site,), {'list_table': list_table})
+
+    page = '<html><body><table><tr><td>news</td></tr></table>' + TORRENTS_PAGE.replace('<html><body>', '')
+    first, second = run(streaming_site(headers={}).torrents_page_flow(0), {'/torrents.php': page})
+
+    assert (first.torrent_id, first.size, first.hit_and_run) == ('2', 1.5 * 1024 ** 3, 3 * 24 * 3600)
+    assert (second.torrent_id, second.size, second.leechers) == ('1', 700 * 1024 ** 2, 0)
+
+def test_torrents_page_flow_without_rows():
+    assert run(Site(headers={}).torrents_page_flow(0), {'/torrents.php': ''}) == []
+
+def test_torrent_flow():
+    torrent = run(Site(headers={}).torrent_flow('2'), {'/details.php': DETAIL_PAGE})
+
+    assert torrent.torrent_name == 'Foo 2024'
+    assert torrent.size == 1.5 * 1024 ** 3
+    assert torrent.seeders == 1024
+    assert torrent.leechers == 7
+    assert torrent.hit_and_run == 5 * 24 * 3600
+    assert (torrent.promotion.upload_ratio, torrent.promotion.download_ratio) == (1, 0)
+
+def test_tasks_flow():
+    pages = {'/usercp.php': USER_PAGE, '/getusertorrentlistajax.php': TASKS_PAGE}
+    tasks = run(Site(headers={}).tasks_flow(), pages)
+
+    assert [(task.torrent_id, task.status) for task in tasks] == [('2', Status.LEECHING), ('2', Status.SEEDING)]
+
+def test_u2_custom_promotion():
+    html = etree.HTML('<table><tr><td><img class="pro_custom"/>[热门] 2.33X 0.50X</td></tr></table>') # pylint: disable=c-extension-no-member
+    promotion = U2(headers={}).get_promotion(html.find('.//img'))
+
+    assert (promotion.upload_ratio, promotion.download_ratio) == (2.33, 0.5)
+
+@mark.parametrize('name, arguments', [('torrents_page_flow', (0,)), ('torrent_flow', ('2',)), ('tasks_flow', ())])
+def test_trusted_crawler_builds_the_same_models(name, arguments):
+    pages = {'/torrents.php': TORRENTS_PAGE, '/details.php': DETAIL_PAGE, '/usercp.php': USER_PAGE, '/getusertorrentlistajax.php': TASKS_PAGE}
+    expected = run(getattr(Site(headers={}), name)(*arguments), pages)
+    actual = run(getattr(Site(headers={}, trusted=True), name)(*arguments), pages)
+
+    assert repr(actual) == repr(expected)
@@ -0,0 +1,61 @@
+from pytest import mark
+
+from crawlers import CHDBits
+from crawlers import MTeam
+from crawlers.base import Torrent
+from crawlers.base import Promotion
+from crawlers.base import TorrentBatch
+from crawlers.selection import Candidates
+from crawlers.selection import select
+
+def build_batch(crawler, rows):
+    return TorrentBatch(
+        crawler,
+        [
+            Torrent(
+                torrent_id=torrent_id,
+                torrent_name=f'torrent {torrent_id}',
+                size=size * 1024 ** 3,
+                seeders=seeders,
+                leechers=leechers,
+                hit_and_run=hit_and_run,
+                promotion=Promotion.intern(upload_ratio=1, download_ratio=download_ratio),
+                crawler=crawler
+            )
+            for torrent_id, size, seeders, leechers, hit_and_run, download_ratio in rows
+        ]
+    )
+
+@mark.parametrize(
+    'options, expected', [
+        ({}, ['m2', 'c1', 'c3', 'm1', 'c2']),
+        ({'free_only': True}, ['c1', 'c3', 'm1']),
+        ({'no_hit_and_run': True}, ['m2', 'c1', 'm1', 'c2']),
+        ({'min_size': 2 * 1024 ** 3, 'max_size': 10 * 1024 ** 3}, ['c3', 'm1']),
+        ({'score': lambda candidates: candidates.sizes}, ['c2', 'm1', 'c3', 'c1', 'm2']),
+    ]
+)
+def test_select(options, expected):
+    chdbits = build_batch(CHDBits(headers={}), [('c1', 1, 1, 8, 0, 0), ('c2', 20, 0, 2, 0, 1), ('c3', 2, 3, 30, 3600, 0)])
+    mteam = build_batch(MTeam(headers={}), [('m1', 4, 0, 6, 0, 0), ('m2', 0.5, 9, 40, 0, 0.5)])
+
+    torrents = select([chdbits, mteam], count=10, **options)
+
+    assert [torrent.torrent_id for torrent in torrents] == expected
+    assert all(isinstance(torrent.crawler, MTeam) == torrent.torrent_id.startswith('m') for torrent in torrents)
+
+def test_select_top_k():
+    crawler = CHDBits(headers={})
+    batches = [build_batch(crawler, [(f'{page}-{row}', 1, 0, page * 10 + row, 0, 0) for row in range(10)]) for page in range(10)]
+
+    assert [torrent.torrent_id for torrent in select(batches, count=3)] == ['9-9', '9-8', '9-7']
+    assert not select(batches, count=0)
+    assert not select([], count=3)
+
+def test_candidates_concatenate_batches():
+    crawler = CHDBits(headers={})
+    candidates = Candidates([build_batch(crawler, [('1', 1, 2, 3, 0, 0)]), TorrentBatch(crawler), build_batch(crawler, [('2', 4, 5, 6, 0, 0)])])
+
+    assert len(candidates) == 2
+    assert candidates.seeders.tolist() == [2, 5]
+    assert candidates.torrent(1).torrent_id == '2'
@@ -0,0 +1,304 @@
+from gzip import decompress
+from json import loads
+from os import stat
+from os import getuid
+from time import sleep
+from time import monotonic
+from threading import Barrier
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import mark
+from pytest import raises
+from requests import Response
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import ReadTimeout
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from crawlers import OurBits
+from crawlers.session import TokenBucket
+from crawlers.session import FileTokenBucket
+from crawlers.session import Session
+from crawlers.session import Cassette
+from crawlers.session import RetryPolicy
+from crawlers.session import AdaptiveRate
+from crawlers.session import learned_rates
+from crawlers.exceptions import RecordingNotFoundException
+from crawlers.exceptions import RequestException
+
+from benchmarks.tracker import Tracker
+
+def test_unlimited_token_bucket():
+    bucket = TokenBucket()
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+@mark.parametrize('burst', [1, 3])
+def test_token_bucket_burst(burst):
+    bucket = TokenBucket(qps=10, burst=burst)
+    assert all(bucket.reserve() == 0 for _ in range(burst))
+    assert bucket.reserve() > 0
+
+def test_token_bucket_reservations_are_ordered():
+    bucket = TokenBucket(qps=10, burst=1)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays == sorted(delays)
+    assert abs(delays[-1] - 0.4) < 0.05
+
+def test_token_bucket_is_thread_safe():
+    bucket = TokenBucket(qps=20, burst=2)
+
+    now = monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: bucket.acquire(), range(12)))
+    escape = monotonic() - now
+
+    assert escape > (12 - 2) / 20 - 0.05
+
+def test_file_token_bucket_is_shared(tmp_path):
+    first = FileTokenBucket(key='https://chdbits.xyz', qps=10, burst=2, directory=str(tmp_path))
+    second = FileTokenBucket(key='https://chdbits.xyz', qps=10, burst=2, directory=str(tmp_path))
+    other = FileTokenBucket(key='https://open.cd', qps=10, burst=2, directory=str(tmp_path))
+
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() > 0
+    assert second.reserve() > 0.1
+    assert other.reserve() == 0
+
+def test_file_token_bucket_recovers_from_corrupt_state(tmp_path):
+    bucket = FileTokenBucket(key='https://chdbits.xyz', qps=10, burst=2, directory=str(tmp_path))
+    for state in ['', '1.5', 'nan 1', 'garbage state']:
+        with open(bucket.path, 'w', encoding='utf8') as file:
+            file.write(state)
+        assert bucket.reserve() == 0
+
+def test_file_token_bucket_directory_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    assert FileTokenBucket.default_directory().endswith(f'pt-crawler-{getuid()}')
+
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    bucket = FileTokenBucket(key='https://chdbits.xyz', qps=10)
+    assert bucket.path.startswith(str(tmp_path / 'pt-crawler'))
+    assert stat(tmp_path / 'pt-crawler').st_mode & 0o777 == 0o700
+
+def test_cassette_records_and_replays(base_url, tmp_path):
+    path = str(tmp_path / 'cassette.jsonl.gz')
+
+    recorder = Session(cassette=Cassette(path, mode='record'))
+    recorded = recorder.get(base_url + '/torrents', params={'page': '1'}, headers={'Cookie': 'secret'})
+    with open(path, 'rb') as file:
+        assert b'secret' not in decompress(file.read())
+
+    player = Session(qps=0.1, cassette=Cassette(path, mode='replay'))
+    now = monotonic()
+    replayed = [player.get(base_url + '/torrents', params={'page': '1'}) for _ in range(3)]
+    assert monotonic() - now < 1
+
+    assert all(response.status_code == 200 for response in replayed)
+    assert all(response.text == recorded.text for response in replayed)
+    with raises(RecordingNotFoundException):
+        player.get(base_url + '/torrents', params={'page': '2'})
+
+def test_cassette_redacts_credentials(base_url, tmp_path):
+    path = str(tmp_path / 'cassette.jsonl.gz')
+
+    recorder = Session(cassette=Cassette(path, mode='record'))
+    recorded = recorder.get(base_url + '/download', params={'id': '12345', 'passkey': 'secret'})
+    with open(path, 'rb') as file:
+        content = decompress(file.read())
+    assert b'secret' not in content
+    assert b'passkey=REDACTED' in content
+
+    player = Session(cassette=Cassette(path, mode='replay'))
+    assert player.get(base_url + '/download', params={'id': '12345', 'passkey': 'other'}).content == recorded.content
+    with raises(RecordingNotFoundException):
+        player.get(base_url + '/download', params={'id': '67890', 'passkey': 'secret'})
+
+def test_cassette_replays_crawler_flows(dummy, tmp_path):
+    path = str(tmp_path / 'cassette.jsonl.gz')
+
+    recorded = dummy(cassette=Cassette(path, mode='record')).get_torrents(pages=2)
+    replayed = dummy(qps=0.1, cassette=Cassette(path, mode='replay')).get_torrents(pages=2)
+    assert [torrent.torrent_id for torrent in replayed] == [torrent.torrent_id for torrent in recorded]
+
+def test_cassette_records_streams_as_they_are_read(base_url, tmp_path):
+    path = str(tmp_path / 'cassette.jsonl.gz')
+    recorder = Session(cassette=Cassette(path, mode='record'))
+
+    with recorder.get(base_url + '/download', params={'id': '12345'}, stream=True) as response:
+        assert not response._content_consumed # pylint: disable=protected-access
+        assert b''.join(response.iter_content(4)) == b'd4:name5:12345e'
+
+    with recorder.get(base_url + '/download', params={'id': '67890'}, stream=True) as response:
+        assert next(response.iter_content(4)) == b'd4:n'
+
+    player = Session(cassette=Cassette(path, mode='replay'))
+    assert player.get(base_url + '/download', params={'id': '12345'}).content == b'd4:name5:12345e'
+    assert player.get(base_url + '/download', params={'id': '67890'}).content == b'd4:n'
+
+def test_cassette_keeps_the_size_limit(dummy, tmp_path):
+    path = str(tmp_path / 'cassette.jsonl.gz')
+    crawler = dummy(max_torrent_size=8, cassette=Cassette(path, mode='record'))
+    crawler.chunk_size = 4
+
+    assert crawler.fetch_torrent_bytes('12345678') is None
+    with open(path, 'rb') as file:
+        interaction = loads(decompress(file.read()).splitlines()[-1])
+    assert interaction['content'] == ''
+    assert dummy(max_torrent_size=8, cassette=Cassette(path, mode='replay')).fetch_torrent_bytes('12345678') is None
+
+def response_with_status(status_code):
+    response = Response()
+    response.status_code = status_code
+    return response
+
+@mark.parametrize(
+    'method, idempotent, status_code, expected',
+    [
+        ('GET', None, 502, True),
+        ('GET', None, 404, False),
+        ('POST', None, 502, False),
+        ('POST', True, 502, True),
+        ('POST', None, 429, True),
+        ('POST', None, 503, True),
+        ('GET', False, 500, False),
+    ]
+)
+def test_retry_policy_is_idempotency_aware(method, idempotent, status_code, expected):
+    policy = RetryPolicy(attempts=3)
+    assert policy.should_retry(0, method, idempotent, response=response_with_status(status_code)) is expected
+    assert not policy.should_retry(2, method, idempotent, response=response_with_status(status_code))
+
+def test_retry_policy_retries_connect_errors_whatever_the_method():
+    policy = RetryPolicy(attempts=3)
+    assert policy.should_retry(0, 'POST', exception=ConnectTimeout())
+    assert not policy.should_retry(0, 'POST', exception=ReadTimeout())
+
+def test_session_retries_refused_posts(closed_url):
+    delays = []
+    policy = RetryPolicy(attempts=3, backoff=0)
+    policy.delay = lambda retry, retry_after=None: delays.append(retry) or 0
+
+    with raises(RequestsConnectionError):
+        Session(retry=policy).post(closed_url + '/takelogin.php')
+    assert delays == [0, 1]
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(backoff=1, max_backoff=3, max_retry_after=10, seed=0)
+
+    assert policy.delay(0, '2') == 2
+    assert policy.delay(0, '600') == 10
+    assert policy.delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert all(0 <= policy.delay(retry) <= min(3, 2 ** retry) for retry in range(6) for _ in range(20))
+
+def test_token_bucket_defers_every_caller():
+    bucket = TokenBucket(qps=10, burst=1)
+    assert bucket.defer(0.5) >= 0.5
+    assert bucket.reserve() > 0.45
+    assert TokenBucket().defer(0.5) == 0.5
+
+def test_session_retries_transient_errors():
+    with Tracker(OurBits, rows=5, pages=3, error_rate=0.5, error_status=502, seed=1) as tracker:
+        crawler = OurBits(headers={}, base_url=tracker.base_url, qps=100, retry=RetryPolicy(attempts=10, backoff=0.01))
+        assert len(crawler.get_torrents(pages=3)) == 15
+        assert tracker.statuses[502] > 0
+
+        crawler = OurBits(headers={}, base_url=tracker.base_url, qps=100)
+        with raises(RequestException):
+            crawler.get_torrents(pages=10)
+
+def test_session_honors_retry_after():
+    with Tracker(OurBits, rows=5, throttle_rate=1, retry_after=0.3) as tracker:
+        session = Session(retry=RetryPolicy(attempts=2))
+        now = monotonic()
+        assert session.get(tracker.base_url + '/torrents.php').status_code == 429
+        assert monotonic() - now >= 0.3
+        assert tracker.statuses[429] == 2
+
+def test_adaptive_rate_increases_additively_and_decreases_multiplicatively():
+    rate = AdaptiveRate(TokenBucket(qps=10), key='aimd', max_qps=12, increase=0.5, cooldown=60, warmup=3)
+
+    for _ in range(10):
+        rate.on_response(200, 0.01)
+    assert rate.qps == 12
+
+    rate.on_response(429, 0.01)
+    assert rate.qps == 6
+    rate.on_response(503, 0.01)
+    assert rate.qps == 6
+    assert learned_rates['aimd'] == 6
+
+    assert AdaptiveRate(TokenBucket(qps=10), key='aimd', max_qps=12).qps == 6
+
+def test_adaptive_rates_without_key_are_not_shared():
+    rate = AdaptiveRate(TokenBucket(qps=10), cooldown=60)
+    rate.on_response(429, 0.01)
+    assert rate.qps == 5
+
+    assert '' not in learned_rates
+    assert AdaptiveRate(TokenBucket(qps=10)).qps == 10
+
+def test_adaptive_rate_backs_off_on_timeouts_and_latency_spikes():
+    rate = AdaptiveRate(TokenBucket(qps=8), key='spikes', min_qps=1, cooldown=0, warmup=3)
+
+    for _ in range(3):
+        rate.on_response(200, 0.1)
+    rate.on_response(200, 1)
+    assert rate.qps == 4
+
+    rate.on_timeout()
+    rate.on_timeout()
+    rate.on_timeout()
+    assert rate.qps == 1
+
+    with raises(ValueError):
+        AdaptiveRate(TokenBucket())
+
+class SlowTokenBucket(TokenBucket):
+    """
+    yields to the other threads whenever its qps is read, which widens the window of any unlocked read-modify-write.
+    """
+
+    @property
+    def qps(self):
+        sleep(0)
+        return self.__dict__['qps']
+
+    @qps.setter
+    def qps(self, value):
+        self.__dict__['qps'] = value
+
+def test_adaptive_rate_is_thread_safe():
+    rate = AdaptiveRate(SlowTokenBucket(qps=1), key='threads', max_qps=1e6, increase=1, cooldown=60)
+    barrier = Barrier(8)
+
+    def increase(_):
+        barrier.wait()
+        for _ in range(200):
+            rate.on_response(200, 0.01)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(increase, range(8)))
+    assert rate.qps == 1 + 8 * 200
+
+    def decrease(_):
+        barrier.wait()
+        rate.on_response(429, 0.01)
+        rate.on_timeout()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(decrease, range(8)))
+    assert rate.qps == (1 + 8 * 200) / 2
+
+def test_adaptive_rate_rejects_shared_buckets(tmp_path):
+    with raises(ValueError):
+        AdaptiveRate(FileTokenBucket(key='https://chdbits.xyz', qps=10, directory=str(tmp_path)))
+
+def test_adaptive_crawler_learns_the_limit_of_the_site():
+    with Tracker(OurBits, rows=5, limit_qps=10, retry_after=0.1) as tracker:
+        crawler = OurBits(headers={}, base_url=tracker.base_url, qps=30, adaptive=True, retry=RetryPolicy(attempts=10, backoff=0.05))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: crawler.get_torrents(), range(30)))
+
+        assert tracker.statuses[429] > 0
+        assert crawler.session.adaptive.qps < 30
+        assert learned_rates[tracker.base_url] == crawler.session.adaptive.qps
@@ -0,0 +1,48 @@
+from time import perf_counter
+
+from pytest import mark
+from pytest import raises
+
+from crawlers import OurBits
+from crawlers.exceptions import RequestException
+
+from benchmarks.parsers import CRAWLERS
+from benchmarks.tracker import Tracker
+
+@mark.parametrize('crawler_class', CRAWLERS, ids=lambda crawler_class: crawler_class.__name__)
+def test_crawlers_target_the_tracker(crawler_class):
+    with Tracker(crawler_class, rows=5, pages=2) as tracker:
+        crawler = crawler_class(headers={'Cookie': 'anonymous'}, base_url=tracker.base_url, qps=100, burst=10)
+
+        torrents = crawler.get_torrents(pages=3)
+        assert len(torrents) == 10
+        assert len({torrent.torrent_id for torrent in torrents}) == 10
+
+        torrent = crawler.get_torrent(torrents[-1].torrent_id)
+        assert torrent.torrent_name == torrents[-1].torrent_name
+
+        assert crawler.get_user().user_name == 'anonymous'
+        assert crawler.get_tasks()
+        assert crawler.fetch_torrent_bytes(torrent.torrent_id) == f'd4:name6:{torrent.torrent_id}e'.encode('utf8')
+        assert set(tracker.statuses) == {200}
+
+def test_tracker_injects_throttling_and_errors():
+    with Tracker(OurBits, rows=5, throttle_rate=1, retry_after=2) as tracker:
+        crawler = OurBits(headers={'Cookie': 'anonymous'}, base_url=tracker.base_url, qps=100)
+        response = crawler.session.get(tracker.base_url + '/torrents.php')
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '2'
+
+        with raises(RequestException):
+            crawler.get_torrents()
+
+        tracker.throttle_rate, tracker.error_rate, tracker.error_status = 0, 1, 503
+        assert crawler.session.get(tracker.base_url + '/torrents.php').status_code == 503
+        assert tracker.statuses == {429: 2, 503: 1}
+
+def test_tracker_latency():
+    with Tracker(OurBits, rows=5, latency=0.2) as tracker:
+        crawler = OurBits(headers={'Cookie': 'anonymous'}, base_url=tracker.base_url, qps=100)
+        started = perf_counter()
+        crawler.get_torrents()
+        assert perf_counter() - started >= 0.2
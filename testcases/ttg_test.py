@@ -1,13 +1,18 @@
 from typing import Dict
 from os import environ
 from time import time
+from time import monotonic
 from tempfile import NamedTemporaryFile
 
 from pytest import fixture
+from pytest import mark
+from requests import Response
 from loguru import logger
 from torrent_parser import parse_torrent_file
 
 from crawlers import TTG
+from crawlers.base import User
+from crawlers.base import Status
 
 @fixture(name='headers', scope='session')
 def _headers() -> Dict[str, str]:
@@ -70,3 +75,29 @@ def test_get_tasks(crawler):
     tasks = crawler.get_tasks()
     for task in tasks:
         print(task)
+
+@mark.parametrize('trusted', [False, True])
+def test_tasks_without_torrent_id_are_skipped(trusted):
+    crawler = TTG(headers={}, trusted=trusted)
+    crawler.user_cache = (monotonic(), User(user_id='1', user_name='anonymous', upload_bytes=0, download_bytes=0, email=None, bonus=0))
+
+    text = '''
+        <table><tr><td>当前上传</td><td><table>
+            <tr><td>type</td><td>name</td></tr>
+            <tr><td></td><td><a href="/details.php?id=42"><b>Foo</b></a></td></tr>
+            <tr><td></td><td><a href="/details.php"><b>Bar</b></a></td></tr>
+        </table></td></tr></table>
+    '''
+
+    response = Response()
+    response.status_code = 200
+    response._content = text.encode('utf8') # pylint: disable=protected-access
+
+    flow = crawler.tasks_flow()
+    next(flow)
+    try:
+        flow.send(response)
+    except StopIteration as stop:
+        tasks = stop.value
+
+    assert [(task.torrent_id, task.torrent_name, task.status) for task in tasks] == [('42', 'Foo', Status.SEEDING)]